@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any, List, Literal, Optional
+from typing import Callable, Dict, Any, List, Literal, Optional
 from pydantic import BaseModel, Field, RootModel
 
 from langchain_core.language_models import BaseLanguageModel
@@ -52,3 +52,20 @@ class AnswerQuestionsChain:
         }
         result: AnswerList = self.chain.invoke(input_data, config=config)
         return [a.model_dump() for a in result.root]
+
+    def invoke_many(
+        self, chunks: List[Dict], questions: List[List[Dict[str, Any]]], config: Optional[Dict] = None, max_concurrency: Optional[int] = None,
+        gate: Optional[Callable] = None,
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """Runnable.batch over (chunk, questions) pairs; a slot is None where that call failed."""
+        inputs = [
+            {
+                "markdown_blocks": json.dumps(c.get("blocks", []), indent=2, ensure_ascii=False),
+                "questions": json.dumps(q, indent=2, ensure_ascii=False),
+            }
+            for c, q in zip(chunks, questions)
+        ]
+        # gate wraps each item (e.g. Retryer.gated) so batched calls share the rate limiter
+        step = self.chain if gate is None else RunnableLambda(lambda x, config: gate(self.chain.invoke, x, config=config))
+        results = step.batch(inputs, config={**(config or {}), "max_concurrency": max_concurrency}, return_exceptions=True)
+        return [None if isinstance(r, Exception) else [a.model_dump() for a in r.root] for r in results]
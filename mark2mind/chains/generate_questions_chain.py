@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional
 from pydantic import BaseModel, Field, RootModel
 
 from langchain_core.language_models import BaseLanguageModel
@@ -45,3 +45,11 @@ class GenerateQuestionsChain:
         blocks_json = json.dumps(chunk.get("blocks", []), indent=2, ensure_ascii=False)
         result: QuestionList = self.chain.invoke({"markdown_blocks": blocks_json}, config=config)
         return [q.model_dump() for q in result.root]
+
+    def invoke_many(self, chunks: List[Dict], config: Optional[Dict] = None, max_concurrency: Optional[int] = None, gate: Optional[Callable] = None) -> List[Optional[List[Dict[str, Any]]]]:
+        """Runnable.batch over several chunks; a slot is None where that call failed."""
+        inputs = [{"markdown_blocks": json.dumps(c.get("blocks", []), indent=2, ensure_ascii=False)} for c in chunks]
+        # gate wraps each item (e.g. Retryer.gated) so batched calls share the rate limiter
+        step = self.chain if gate is None else RunnableLambda(lambda x, config: gate(self.chain.invoke, x, config=config))
+        results = step.batch(inputs, config={**(config or {}), "max_concurrency": max_concurrency}, return_exceptions=True)
+        return [None if isinstance(r, Exception) else [q.model_dump() for q in r.root] for r in results]
@@ -15,6 +15,14 @@ class TreeOutputSchema(BaseModel):
     tags: List[str] = Field(default_factory=list, description="Flat list of semantic keywords")
 
 
+class TreeBatchItemSchema(TreeOutputSchema):
+    index: int = Field(..., description="Index of the input chunk this tree was built from")
+
+
+class TreeBatchOutputSchema(BaseModel):
+    results: List[TreeBatchItemSchema] = Field(..., description="One tree per input chunk")
+
+
 _empty_tag_chunks = 0
 
 
@@ -39,11 +47,48 @@ class ChunkTreeChain:
             tags=["mark2mind", "tree", "chunk", "class:ChunkTreeChain"],
         )
 
+        # batched variant: several small chunks in one request, one tree per chunk back
+        self.batch_parser = PydanticOutputParser(pydantic_object=TreeBatchOutputSchema)
+        batch_prompt = PromptTemplate.from_template(
+            "{base_prompt}\n\n"
+            "You are given several independent chunks. Apply the rules above to each chunk "
+            "separately and return one result per chunk, tagged with that chunk's `index`.\n\n"
+            "{format_instructions}\n\n"
+            "Chunks (JSON array of {{index, markdown_blocks}}):\n{chunks}"
+        ).partial(
+            base_prompt=base_prompt,
+            format_instructions=self.batch_parser.get_format_instructions(),
+        )
+        batch_shim = RunnableLambda(lambda x: x).with_config(run_name="ChunkTreeBatchChain")
+        self.batch_chain = (
+            batch_prompt | llm | self.batch_parser | batch_shim
+        ).with_config(
+            callbacks=callbacks,
+            tags=["mark2mind", "tree", "chunk", "class:ChunkTreeChain"],
+        )
+
 
     def invoke(self, chunk: Dict, config: Optional[Dict] = None) -> Dict[str, Any]:
         markdown_json = json.dumps(chunk.get("blocks", []), indent=2, ensure_ascii=False)
         result: TreeOutputSchema = self.chain.invoke({"markdown_blocks": markdown_json}, config=config)
-        out = result.model_dump()
+        return self._finish(result.model_dump())
+
+    def invoke_batch(self, chunks: List[Dict], config: Optional[Dict] = None) -> List[Optional[Dict[str, Any]]]:
+        """
+        One LLM call for several chunks. Returns results aligned with ``chunks``;
+        a slot is None when the model skipped that chunk.
+        """
+        payload = [{"index": i, "markdown_blocks": c.get("blocks", [])} for i, c in enumerate(chunks)]
+        result: TreeBatchOutputSchema = self.batch_chain.invoke(
+            {"chunks": json.dumps(payload, indent=2, ensure_ascii=False)}, config=config
+        )
+        outs: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        for item in result.results:
+            if 0 <= item.index < len(chunks) and outs[item.index] is None:
+                outs[item.index] = self._finish(item.model_dump(exclude={"index"}))
+        return outs
+
+    def _finish(self, out: Dict[str, Any]) -> Dict[str, Any]:
         out["tree"] = normalize_tree(out["tree"])
         if not out["tags"]:
             global _empty_tag_chunks
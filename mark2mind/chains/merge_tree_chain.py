@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 
 from langchain.prompts import PromptTemplate
@@ -35,6 +35,22 @@ class TreeMergeChain:
             tags=["mark2mind", "tree", "merge", "class:TreeMergeChain"],
         )
 
+        # N-way variant: one call merges a whole list of trees
+        many_prompt = PromptTemplate.from_template(
+            "{base_prompt}\n\n{format_instructions}\n\n"
+            "Trees (JSON array):\n{trees}"
+        ).partial(
+            base_prompt=load_prompt("merge_trees").strip(),
+            format_instructions=self.parser.get_format_instructions(),
+        )
+        many_shim = RunnableLambda(lambda x: x).with_config(run_name="TreeMergeManyChain")
+        self.many_chain = (
+            many_prompt | llm | self.parser | many_shim
+        ).with_config(
+            callbacks=callbacks,
+            tags=["mark2mind", "tree", "merge", "class:TreeMergeChain"],
+        )
+
 
     def invoke(self, tree_a: Dict[str, Any], tree_b: Dict[str, Any], config: Optional[Dict] = None) -> Dict[str, Any]:
         payload = {
@@ -44,3 +60,9 @@ class TreeMergeChain:
         result: MergedTreeSchema = self.chain.invoke(payload, config=config)
         merged = result.model_dump()["tree"]
         return normalize_tree(merged)
+
+    def invoke_many(self, trees: List[Dict[str, Any]], config: Optional[Dict] = None) -> Dict[str, Any]:
+        payload = {"trees": json.dumps(trees, indent=2, ensure_ascii=False)}
+        result: MergedTreeSchema = self.many_chain.invoke(payload, config=config)
+        merged = result.model_dump()["tree"]
+        return normalize_tree(merged)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field, RootModel
-from typing import Dict, List, Optional
+from typing import Dict, List, Literal, Optional
 from pathlib import Path
 import json
 import os
@@ -78,6 +78,19 @@ class RuntimeConfig(BaseModel):
     min_delay_sec: float = 0.15
     max_retries: int = 4
     map_batch_override: Optional[int] = None
+    # cap on LLM clients (HTTP sessions); extra workers share them (None = one per worker)
+    llm_max_clients: Optional[int] = 8
+    # reuse LLM results from earlier runs (only when llm.temperature == 0)
+    llm_cache: bool = True
+    # tree step: up to N small consecutive chunks share one LLM request (1 = one call per chunk)
+    tree_batch_size: int = 4
+    # tree step: chunks whose text is this similar (TF-IDF cosine) to an earlier one reuse its tree (0 = off; exact duplicates always do)
+    tree_dedup_threshold: float = 0.0
+    # tree step: chunks with fewer paragraph tokens than this get no tree and no LLM call (0 = off)
+    tree_min_prose_tokens: int = 0
+    # merge step: "pairwise" tournament, one "nway" call per cluster, or "auto" (nway when it fits)
+    merge_strategy: Literal["auto", "nway", "pairwise"] = "auto"
+    merge_max_prompt_tokens: int = 32000
 
 
 class PipelineConfig(BaseModel):
@@ -4,6 +4,7 @@ from langchain import globals as lc_globals
 lc_globals.set_verbose(True)
 
 import argparse
+import multiprocessing
 import os
 import uuid
 from datetime import datetime
@@ -69,6 +70,12 @@ def build_parser() -> argparse.ArgumentParser:
         help="Enable local tracing in debug/<run_name>/traces",
     )
     p.add_argument("--max-workers", type=int, default=None, help="ThreadPool max workers")
+    p.add_argument(
+        "--merge-strategy",
+        choices=["pairwise", "nway", "auto"],
+        default=None,
+        help="Cluster merge: pairwise tournament, one N-way call per cluster, or auto",
+    )
 
     return p
 
@@ -89,22 +96,26 @@ def load_llm_from_config(app: AppConfig) -> ChatDeepSeek:
     )
 
 
-def main():
+def main(argv: list[str] | None = None) -> int:
+    """
+    CLI entry point. Pass ``argv`` to drive a run in-process (defaults to sys.argv[1:]).
+    """
+    # frozen builds re-run main() in ProcessPoolExecutor children (MARK2MIND_CLUSTER_PROCESS)
+    multiprocessing.freeze_support()
     parser = build_parser()
-    import sys
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # List and exit
     if args.list_recipes:
         print("Available recipes:")
         for name in get_recipe_names():
             print(f"  - {name}")
-        sys.exit(0)
+        return 0
 
     # Require one of --config or --recipe (but allow --input-only default if you want later)
     if not args.config and not args.recipe:
         parser.print_help()
-        sys.exit(0)
+        return 0
 
     # Load config from built-in recipe OR from file
     if args.recipe:
@@ -173,6 +184,8 @@ def main():
         cfg.use_debug_io = True
     if args.max_workers is not None:
         cfg.executor_max_workers = args.max_workers
+    if args.merge_strategy:
+        cfg.merge_strategy = args.merge_strategy
 
     # Build runner
     runner = StepRunner(
@@ -183,7 +196,9 @@ def main():
     )
 
     runner.run()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    import sys
+    sys.exit(main())
@@ -6,3 +6,5 @@ from .retry import Retryer
 from .llm_pool import LLMFactoryPool
 from .models import Chunk, Block, QAPair
 from .executor_provider import ExecutorProvider
+from .llm_cache import LLMResponseCache
+from .pairwise import reduce_pairwise
@@ -1,14 +1,50 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional
 import json
+import mmap
+import os
+import shutil
+
+try:
+    import orjson as _orjson  # optional fast path for large debug artifacts
+except Exception:
+    _orjson = None
+
+try:
+    import msgpack as _msgpack  # optional binary copies of stage-to-stage artifacts
+except Exception:
+    _msgpack = None
 
 
 SCHEMA_VERSION = "v2-min"
 
+# debug artifacts are written compact; MARK2MIND_DEBUG_PRETTY=1 indents them for reading
+DEBUG_PRETTY = os.getenv("MARK2MIND_DEBUG_PRETTY", "").strip() == "1"
+
+
+def _dumps(obj: Any, indent: bool) -> bytes:
+    if _orjson is not None:
+        option = _orjson.OPT_NON_STR_KEYS | _orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= _orjson.OPT_INDENT_2
+        return _orjson.dumps(obj, default=str, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _loads_mapped(p: Path) -> Any:
+    # parse straight from the page cache: no bytes copy of a multi-MB artifact
+    with p.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _orjson.loads(b"")  # raises like a read of an empty file would
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return _orjson.loads(view)
+
 
 class ArtifactStore:
     """
@@ -53,7 +89,52 @@ class ArtifactStore:
             return
         p = self.debug_dir / name
         p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(json.dumps(self._wrap(obj, "debug"), indent=2, ensure_ascii=False), encoding="utf-8")
+        p.write_bytes(_dumps(self._wrap(obj, "debug"), indent=DEBUG_PRETTY))
+
+    def save_debug_fast(self, name: str, obj: Any):
+        """
+        Writes a msgpack copy next to the JSON artifact ("<name>.msgpack") for fast reloads.
+
+        No-op without msgpack installed; load_debug_fast then falls back to the JSON copy.
+        """
+        if not self.enable_debug or _msgpack is None:
+            return
+        p = self.debug_dir / f"{name}.msgpack"
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(_msgpack.packb(self._wrap(obj, "debug"), use_bin_type=True, default=str))
+
+    def load_debug_fast(self, name: str) -> Optional[Any]:
+        p = self.debug_dir / f"{name}.msgpack"
+        if _msgpack is not None and p.exists():
+            # stale if the JSON copy was edited/rewritten after the binary one
+            j = self.debug_dir / name
+            if not j.exists() or j.stat().st_mtime <= p.stat().st_mtime:
+                try:
+                    return _msgpack.unpackb(p.read_bytes(), raw=False).get("payload")
+                except Exception:
+                    pass
+        return self.load_debug(name)
+
+    @contextmanager
+    def debug_jsonl(self, name: str) -> Iterator[Callable[[Any], None]]:
+        """
+        Streams records to <debug_dir>/<name> as JSON lines while a stage is still running.
+
+        Yields a ``write(record)`` callable (a no-op when debug is off).
+        """
+        if not self.enable_debug:
+            yield lambda record: None
+            return
+        p = self.debug_dir / name
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with p.open("wb") as f:
+            def write(record: Any) -> None:
+                f.write(_dumps(record, indent=False) + b"\n")
+                f.flush()
+            yield write
+
+    def discard_debug(self, name: str) -> None:
+        (self.debug_dir / name).unlink(missing_ok=True)
 
     def exists(self, name: str) -> bool:
         return (self.debug_dir / name).exists()
@@ -62,7 +143,10 @@ class ArtifactStore:
         p = self.debug_dir / name
         if not p.exists():
             return None
-        raw = json.loads(p.read_text(encoding="utf-8"))
+        if _orjson is None:
+            raw = json.loads(p.read_text(encoding="utf-8"))
+        else:
+            raw = _loads_mapped(p)
         return raw.get("payload")
 
     # ----- final outputs (auto-named) ----------------------------------------
@@ -78,9 +162,34 @@ class ArtifactStore:
         p.parent.mkdir(parents=True, exist_ok=True)
         p.write_text(text, encoding="utf-8")
 
+    def copy_file(self, rel_path: str, src: Path, *, link: bool = False) -> Path:
+        """
+        Byte-copies an existing file under the workspace dir (no decode/encode).
+
+        No-op when ``src`` already is that workspace file. With ``link=True`` a hardlink
+        is tried first; cross-device or unsupported links fall back to a copy.
+        """
+        p = (self.workspace_dir / rel_path).resolve()
+        src = Path(src).resolve()
+        if p == src:
+            return p
+        p.parent.mkdir(parents=True, exist_ok=True)
+        if link:
+            try:
+                p.unlink(missing_ok=True)
+                os.link(src, p)
+                return p
+            except OSError:
+                pass
+        shutil.copyfile(src, p)
+        return p
+
     def save_output_json(self, rel_path: str, obj: Any):
         p = self.workspace_dir / rel_path
         p.parent.mkdir(parents=True, exist_ok=True)
+        if _orjson is not None:
+            p.write_bytes(_orjson.dumps(obj, option=_orjson.OPT_INDENT_2 | _orjson.OPT_NON_STR_KEYS))
+            return
         p.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
 
     # Resolve path inside workspace (handy for subtitles manifest)
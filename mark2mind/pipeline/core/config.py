@@ -3,10 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from pathlib import Path
 import os
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from mark2mind.config_schema import AppConfig
 
+MergeStrategy = Literal["auto", "nway", "pairwise"]
+
 
 @dataclass
 class RunConfig:
@@ -35,7 +37,14 @@ class RunConfig:
     min_delay_sec: float = float(os.getenv("MARK2MIND_MIN_DELAY_SEC", "0.15"))
     max_retries: int = int(os.getenv("MARK2MIND_MAX_RETRIES", "4"))
     executor_max_workers: Optional[int] = None
+    llm_max_clients: Optional[int] = 8
+    llm_cache: bool = True
     map_batch_override: Optional[int] = None
+    tree_batch_size: int = 4
+    tree_dedup_threshold: float = 0.0
+    tree_min_prose_tokens: int = 0
+    merge_strategy: MergeStrategy = "auto"
+    merge_max_prompt_tokens: int = 32000
 
     def __post_init__(self):
         env_map = os.getenv("MARK2MIND_MAP_BATCH", "").strip().lower()
@@ -66,5 +75,12 @@ class RunConfig:
             min_delay_sec=app.runtime.min_delay_sec,
             max_retries=app.runtime.max_retries,
             executor_max_workers=app.runtime.executor_max_workers,
+            llm_max_clients=app.runtime.llm_max_clients,
+            llm_cache=app.runtime.llm_cache,
+            tree_batch_size=app.runtime.tree_batch_size,
+            tree_dedup_threshold=app.runtime.tree_dedup_threshold,
+            tree_min_prose_tokens=app.runtime.tree_min_prose_tokens,
+            merge_strategy=app.runtime.merge_strategy,
+            merge_max_prompt_tokens=app.runtime.merge_max_prompt_tokens,
             app=app,
         )
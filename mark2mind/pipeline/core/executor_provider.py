@@ -1,10 +1,84 @@
 from __future__ import annotations
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+import threading
+
+
+def completed_batches(futures: Iterable[Future], window: float = 0.05) -> Iterator[List[Future]]:
+    """
+    Like `as_completed`, but yields every future that finished within `window` seconds
+    as one list, so callers can do one `progress.advance(task, len(done))` per batch.
+    """
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        if pending:
+            more, pending = wait(pending, timeout=window)
+            done |= more
+        yield list(done)
+
+
+class _SharedPoolContext:
+    """`with executor.get() as pool:` view of the shared pool; leaving the block keeps it alive."""
+    def __init__(self, pool: ThreadPoolExecutor):
+        self._pool = pool
+
+    def __enter__(self) -> ThreadPoolExecutor:
+        return self._pool
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
 
 class ExecutorProvider:
+    """
+    One long-lived thread pool for the whole pipeline.
+
+    Stages either `acquire()` it directly or keep using `with executor.get() as pool:`;
+    threads are torn down only by `shutdown()` at pipeline teardown.
+    """
+    # LLM calls are I/O-bound; ThreadPoolExecutor's cpu-based default is far too small for them
+    DEFAULT_MAX_WORKERS = 32
+
     def __init__(self, max_workers: Optional[int] = None):
-        self.max_workers = max_workers
+        self.max_workers = max_workers or self.DEFAULT_MAX_WORKERS
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def acquire(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def get(self) -> _SharedPoolContext:
+        return _SharedPoolContext(self.acquire())
+
+    def warm_up(self, init: Optional[Callable[[], Any]] = None) -> None:
+        # one parked task per worker forces every thread to start now, so the first
+        # real submits don't pay thread start-up (idle threads would otherwise be reused);
+        # `init` runs once on each worker, e.g. to build its thread-local LLM client
+        pool = self.acquire()
+        n = self.max_workers
+        barrier = threading.Barrier(n)
+
+        def park():
+            if init is not None:
+                try:
+                    init()
+                except Exception:
+                    pass  # surfaces again on first real use, where the stage can report it
+            try:
+                barrier.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+
+        for f in [pool.submit(park) for _ in range(n)]:
+            f.result()
 
-    def get(self) -> ThreadPoolExecutor:
-        return ThreadPoolExecutor(max_workers=self.max_workers)
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait)
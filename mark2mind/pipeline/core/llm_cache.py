@@ -0,0 +1,88 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+import hashlib
+import json
+import sqlite3
+import threading
+
+from mark2mind.utils.prompt_loader import load_prompt
+
+
+class LLMResponseCache:
+    """
+    Exact-match on-disk cache of parsed chain results (SQLite).
+
+    Keyed by (chain name, model, prompt text, input payload), so editing a prompt or
+    switching models misses the cache. Only enabled for deterministic runs
+    (temperature == 0); otherwise every call goes straight to the LLM.
+    With ``refresh=True`` lookups always miss but fresh results are still stored.
+    """
+    def __init__(self, path: Optional[Path], model: str, enabled: bool = True, refresh: bool = False):
+        self.model = model
+        self.enabled = bool(enabled and path)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        # prompt_key -> prompt text, read from disk once per cache instance
+        self._prompts: Dict[str, str] = {}
+        self._db: Optional[sqlite3.Connection] = None
+        if self.enabled:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.commit()
+
+    def _prompt(self, prompt_key: str) -> str:
+        text = self._prompts.get(prompt_key)
+        if text is None:
+            text = self._prompts[prompt_key] = load_prompt(prompt_key)
+        return text
+
+    def key(self, chain_name: str, prompt_key: str, payload: Any) -> str:
+        raw = json.dumps(
+            [chain_name, self.model, self._prompt(prompt_key), payload],
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self._db or self.refresh:
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, value: Any) -> None:
+        if not self._db:
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value) VALUES (?, ?)",
+                (key, json.dumps(value, ensure_ascii=False, default=str)),
+            )
+            self._db.commit()
+
+    def lookup(self, chain_name: str, prompt_key: str, payload: Any) -> Optional[Any]:
+        return self.get(self.key(chain_name, prompt_key, payload)) if self.enabled else None
+
+    def remember(self, chain_name: str, prompt_key: str, payload: Any, value: Any) -> None:
+        if self.enabled:
+            self.put(self.key(chain_name, prompt_key, payload), value)
+
+    def call(self, chain_name: str, prompt_key: str, payload: Any, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return fn()
+        k = self.key(chain_name, prompt_key, payload)
+        hit = self.get(k)
+        if hit is not None:
+            return hit
+        value = fn()
+        self.put(k, value)
+        return value
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db:
+                self._db.close()
+                self._db = None
@@ -1,16 +1,40 @@
 from __future__ import annotations
 import threading
-from typing import Optional, Callable, Dict, Any
+from typing import Optional, Callable, Dict, Any, List
 
 class LLMFactoryPool:
     """
     One client per thread. If factory is None, stages reuse provided chains' internal clients.
+
+    With ``max_clients`` set, at most that many clients are ever built; further threads
+    are bound round-robin to existing ones (chat clients are thread-safe), which caps open
+    HTTP sessions when the executor has many more workers than that.
     """
-    def __init__(self, factory: Optional[Callable[[], Any]] = None):
+    def __init__(self, factory: Optional[Callable[[], Any]] = None, max_clients: Optional[int] = None):
         self.factory = factory
+        self.max_clients = max_clients if max_clients and max_clients > 0 else None
         self._thread_local = threading.local()
+        self._clients: List[Any] = []
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def _new_or_shared(self):
+        if self.max_clients is None:
+            return self.factory()
+        with self._lock:
+            if len(self._clients) < self.max_clients:
+                self._clients.append(self.factory())
+                return self._clients[-1]
+            llm = self._clients[self._next % len(self._clients)]
+            self._next += 1
+            return llm
 
     def get(self):
         if getattr(self._thread_local, "llm", None) is None:
-            self._thread_local.llm = self.factory() if self.factory else None
+            self._thread_local.llm = self._new_or_shared() if self.factory else None
         return self._thread_local.llm
+
+    def prewarm(self) -> None:
+        """Build this thread's client ahead of time (run once per worker at startup)."""
+        if self.factory is not None:
+            self.get()
@@ -0,0 +1,63 @@
+from __future__ import annotations
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def reduce_pairwise(
+    groups: Sequence[Sequence[T]],
+    submit: Callable[[int, int, int, T, T], Future],
+    on_group_done: Callable[[int], None] = lambda gid: None,
+) -> List[Optional[T]]:
+    """
+    Barrier-free pairwise tournament over several groups at once.
+
+    The bracket is the usual one (level r pairs 2k with 2k+1, an odd last item moves
+    up unchanged), so results are deterministic; but a pair is submitted as soon as
+    both of its inputs exist instead of waiting for the whole level to finish.
+    ``submit(gid, level, k, a, b)`` must return a Future of the merged item.
+    Input groups are only read, never copied or mutated; in-flight state is one
+    slot per waiting item, so no per-round lists are built.
+    """
+    results: List[Optional[T]] = [None] * len(groups)
+    sizes: List[List[int]] = []
+    for items in groups:
+        n, levels = len(items), [len(items)]
+        while n > 1:
+            n = (n + 1) // 2
+            levels.append(n)
+        sizes.append(levels)
+
+    slots: Dict[Tuple[int, int, int], T] = {}
+    pending: Dict[Future, Tuple[int, int, int]] = {}
+
+    def place(gid: int, level: int, j: int, item: T) -> None:
+        width = sizes[gid][level]
+        if width == 1:
+            results[gid] = item
+            on_group_done(gid)
+            return
+        if width % 2 == 1 and j == width - 1:
+            place(gid, level + 1, j // 2, item)
+            return
+        partner = slots.pop((gid, level, j ^ 1), None)
+        if partner is None:
+            slots[(gid, level, j)] = item
+            return
+        a, b = (item, partner) if j % 2 == 0 else (partner, item)
+        pending[submit(gid, level, j // 2, a, b)] = (gid, level + 1, j // 2)
+
+    for gid, items in enumerate(groups):
+        if not items:
+            on_group_done(gid)
+        for j, item in enumerate(items):
+            place(gid, 0, j, item)
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for f in done:
+            gid, level, j = pending.pop(f)
+            place(gid, level, j, f.result())
+
+    return results
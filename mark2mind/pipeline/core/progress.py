@@ -1,4 +1,6 @@
 from __future__ import annotations
+import threading
+import time
 from typing import Any, Dict, Optional
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, MofNCompleteColumn, TimeElapsedColumn, TimeRemainingColumn
@@ -10,6 +12,8 @@ class ProgressReporter:
     def close(self): ...
 
 class RichProgressReporter(ProgressReporter):
+    FLUSH_SEC = 0.1
+
     def __init__(self, console: Optional[Console] = None):
         self.console = console or Console()
         self.progress = Progress(
@@ -23,24 +27,69 @@ class RichProgressReporter(ProgressReporter):
             console=self.console,
         )
         self._started = False
+        self._pending: Dict[Any, int] = {}
+        self._pending_lock = threading.Lock()
+        # one long-lived flusher thread, woken by _dirty, pushes coalesced counts to rich
+        self._dirty = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        # held while counts are pushed to rich, so finish/close wait for an in-flight flush
+        self._flush_lock = threading.Lock()
 
     def __enter__(self): 
         self.progress.__enter__(); self._started = True; return self
 
     def __exit__(self, exc_type, exc, tb):
+        self._stop_flusher()
         self.progress.__exit__(exc_type, exc, tb); self._started = False
 
     def start(self, description: str, total: Optional[int] = None):
         return self.progress.add_task(description, total=total)
 
     def advance(self, task: Any, step: int = 1):
-        self.progress.advance(task, step)
+        # coalesce: counts pile up and reach rich at most every FLUSH_SEC (plus a trailing flush)
+        with self._pending_lock:
+            self._pending[task] = self._pending.get(task, 0) + step
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="progress-flush", daemon=True)
+                self._flusher.start()
+        self._dirty.set()
+
+    def _flush_loop(self):
+        me = threading.current_thread()
+        while True:
+            self._dirty.wait()
+            if self._flusher is not me:
+                return  # stopped (or replaced after a close)
+            time.sleep(self.FLUSH_SEC)
+            self._dirty.clear()
+            self._flush()
+            if self._flusher is not me:
+                return
+
+    def _flush(self):
+        with self._flush_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            for task, step in pending.items():
+                self.progress.advance(task, step)
+
+    def _stop_flusher(self):
+        with self._pending_lock:
+            flusher, self._flusher = self._flusher, None
+        if flusher is not None:
+            self._dirty.set()
+            flusher.join()
+            self._dirty.clear()
+        self._flush()
 
     def finish(self, task: Any):
-        self.progress.update(task, completed=self.progress.tasks[task].total)
+        self._flush()
+        with self._flush_lock:
+            self.progress.update(task, completed=self.progress.tasks[task].total)
 
     def close(self):
         if self._started:
+            self._stop_flusher()
             self.progress.__exit__(None, None, None)
             self._started = False
 
@@ -1,33 +1,140 @@
 from __future__ import annotations
-import time, random, threading
-from typing import Callable, Any
+import os, time, random, threading
+from typing import Callable, Any, Optional
+
+
+class _TokenBucket:
+    """Process-wide request bucket: `rate` tokens/sec, bursts up to `capacity`."""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # take the token now (may go negative) so concurrent callers queue up behind it
+            self._tokens -= 1.0
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class _AIMDLimit:
+    """
+    Adaptive cap on in-flight LLM calls: halved on a rate-limit error,
+    raised by one after every `recover_after` successes (up to `ceiling`).
+    """
+    def __init__(self, ceiling: int, recover_after: int = 10):
+        self.ceiling = max(1, ceiling)
+        self.limit = self.ceiling
+        self.recover_after = recover_after
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+        return False
+
+    def on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.recover_after and self.limit < self.ceiling:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def on_rate_limited(self) -> None:
+        with self._cond:
+            self.limit = max(1, self.limit // 2)
+            self._successes = 0
+
+
+def _http_status(e: Exception) -> Optional[int]:
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after_sec(e: Exception) -> Optional[float]:
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None  # HTTP-date form; fall back to exponential backoff
+
+
+def _env_float(name: str, default: float) -> float:
+    # malformed or negative values fall back to the default instead of failing the run
+    try:
+        value = float(os.getenv(name, "") or default)
+    except ValueError:
+        return default
+    return value if value >= 0 else default
+
 
 class Retryer:
-    def __init__(self, max_retries: int = 4, min_delay_sec: float = 0.15):
+    def __init__(self, max_retries: int = 4, min_delay_sec: float = 0.15, max_concurrency: Optional[int] = None):
         self.max_retries = max_retries
         self.min_delay_sec = min_delay_sec
-        self._last_call_ts = 0.0
-        self._lock = threading.Lock()
+        self._limit: Optional[_AIMDLimit] = _AIMDLimit(max_concurrency) if max_concurrency else None
+        # MARK2MIND_RPS / MARK2MIND_BURST override the rate derived from min_delay_sec
+        rps = _env_float("MARK2MIND_RPS", 0.0) or (1.0 / min_delay_sec if min_delay_sec > 0 else 0.0)
+        burst = _env_float("MARK2MIND_BURST", 1.0)
+        self._bucket: Optional[_TokenBucket] = _TokenBucket(rps, burst) if rps > 0 else None
 
     def _rate_limit_pause(self):
-        # Protect shared timestamp across threads
-        with self._lock:
-            now = time.time()
-            dt = now - self._last_call_ts
-            sleep_for = self.min_delay_sec - dt + random.uniform(0, 0.05) if dt < self.min_delay_sec else 0.0
-            # Reserve slot now so other threads see the updated timestamp
-            self._last_call_ts = time.time()
-        if sleep_for > 0:
-            time.sleep(sleep_for)
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+    def _invoke(self, fn: Callable, *args, **kwargs) -> Any:
+        if self._limit is None:
+            return fn(*args, **kwargs)
+        with self._limit:
+            out = fn(*args, **kwargs)
+        self._limit.on_success()
+        return out
+
+    def gated(self, fn: Callable, *args, **kwargs) -> Any:
+        """One attempt through the rate bucket and in-flight cap; for callers that retry themselves."""
+        self._rate_limit_pause()
+        try:
+            return self._invoke(fn, *args, **kwargs)
+        except Exception as e:
+            if _http_status(e) == 429 and self._limit is not None:
+                self._limit.on_rate_limited()
+            raise
 
     def call(self, fn: Callable, *args, **kwargs) -> Any:
         for attempt in range(1, self.max_retries + 1):
             try:
                 self._rate_limit_pause()
-                return fn(*args, **kwargs)
+                return self._invoke(fn, *args, **kwargs)
             except Exception as e:
                 if attempt == self.max_retries:
                     raise
                 print(f"[retry] attempt {attempt} failed: {type(e).__name__}: {e}")
-                backoff = min(2 ** (attempt - 1), 8) + random.uniform(0, 0.25)
-                time.sleep(backoff)
+                rate_limited = _http_status(e) == 429
+                if rate_limited and self._limit is not None:
+                    self._limit.on_rate_limited()
+                # honour the provider's Retry-After on 429s; otherwise exponential backoff
+                wait = _retry_after_sec(e) if rate_limited else None
+                if wait is None:
+                    wait = min(2 ** (attempt - 1), 8) + random.uniform(0, 0.25)
+                time.sleep(wait)
@@ -2,7 +2,15 @@ from __future__ import annotations
 from pathlib import Path
 import json
 
+try:
+    import orjson as _orjson  # optional: much faster on large trees, writes bytes directly
+except Exception:
+    _orjson = None
+
 class JSONExporter:
     def export_mindmap(self, final_tree: dict, out_path: Path):
         out_path.parent.mkdir(parents=True, exist_ok=True)
+        if _orjson is not None:
+            out_path.write_bytes(_orjson.dumps(final_tree, option=_orjson.OPT_INDENT_2 | _orjson.OPT_NON_STR_KEYS))
+            return
         out_path.write_text(json.dumps(final_tree, indent=2, ensure_ascii=False), encoding="utf-8")
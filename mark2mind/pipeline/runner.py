@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import Optional, Dict, Any, List
 from rich.console import Console
 from datetime import datetime
+import os
 import uuid
 
 from mark2mind import __version__
@@ -20,6 +21,7 @@ from .core.progress import RichProgressReporter
 from .core.retry import Retryer
 from .core.llm_pool import LLMFactoryPool
 from .core.executor_provider import ExecutorProvider
+from .core.llm_cache import LLMResponseCache
 from .stages import (
     ChunkStage,
     QAStage,
@@ -44,6 +46,22 @@ from mark2mind.pipeline.stages.bullets import BulletsStage
 from mark2mind.utils.exporters import to_camel_nospace
 from mark2mind.utils.validate_links import validate_pages
 
+# steps that call the LLM; only these are worth pre-starting the worker clients for
+_LLM_STEPS = frozenset({
+    "reformat", "clean_for_map", "bullets", "qa", "tree", "merge", "refine", "map", "enrich_markmap_notes",
+})
+
+
+def _llm_cache_enabled(cfg: RunConfig) -> bool:
+    """[runtime].llm_cache for temperature-0 runs; MARK2MIND_LLM_CACHE=0/1 overrides either way."""
+    if cfg.app is None:
+        return False
+    env = os.getenv("MARK2MIND_LLM_CACHE", "").strip()
+    if env:
+        return env not in ("0", "false", "no")
+    return bool(cfg.llm_cache and cfg.app.llm.temperature == 0)
+
+
 class StepRunner:
     def __init__(
         self,
@@ -71,11 +89,26 @@ class StepRunner:
             run_name=config.run_name,
             enable_debug=self.debug
         )
-        self.retryer = Retryer(max_retries=config.max_retries, min_delay_sec=config.min_delay_sec)
-        self.llm_pool = LLMFactoryPool(llm_factory)
         self.executor = ExecutorProvider(max_workers=config.executor_max_workers)
+        # the adaptive in-flight cap starts at the pool's real size (32 when executor_max_workers is unset)
+        self.retryer = Retryer(
+            max_retries=config.max_retries,
+            min_delay_sec=config.min_delay_sec,
+            max_concurrency=self.executor.max_workers,
+        )
+        self.llm_pool = LLMFactoryPool(
+            llm_factory, max_clients=config.llm_max_clients if config.app else None
+        )
 
         app = config.app
+        # exact-match LLM result cache; only deterministic (temperature 0) runs can reuse answers
+        self.llm_cache = LLMResponseCache(
+            self.store.workspace_dir / ".llm_cache" / "responses.sqlite",
+            model=app.llm.model if app else "unknown",
+            enabled=_llm_cache_enabled(config),
+            refresh=os.getenv("MARK2MIND_LLM_CACHE_REFRESH", "").strip() == "1",
+        )
+
         if app:
             os_env = __import__("os").environ
             os_env["MARK2MIND_CHUNK_OVERLAP_TOKENS"] = str(app.chunk.overlap_tokens)
@@ -87,12 +120,12 @@ class StepRunner:
 
         # Stages
         self.chunk_stage = ChunkStage()
-        self.qa_stage = QAStage(self.llm_pool, self.retryer, callbacks=callbacks)
-        self.tree_stage = TreeStage(self.llm_pool, self.retryer, callbacks=callbacks)
+        self.qa_stage = QAStage(self.llm_pool, self.retryer, callbacks=callbacks, cache=self.llm_cache)
+        self.tree_stage = TreeStage(self.llm_pool, self.retryer, callbacks=callbacks, cache=self.llm_cache)
         self.cluster_stage = ClusterStage()
-        self.merge_stage = MergeStage(self.llm_pool, self.retryer, callbacks=callbacks)
-        self.refine_stage = RefineStage(self.llm_pool, self.retryer, callbacks=callbacks)
-        self.map_stage = MapContentStage(self.llm_pool, self.retryer, callbacks=callbacks)
+        self.merge_stage = MergeStage(self.llm_pool, self.retryer, callbacks=callbacks, cache=self.llm_cache)
+        self.refine_stage = RefineStage(self.llm_pool, self.retryer, callbacks=callbacks, cache=self.llm_cache)
+        self.map_stage = MapContentStage(self.llm_pool, self.retryer, callbacks=callbacks, cache=self.llm_cache)
         self.bullets_stage = BulletsStage(self.llm_pool, self.retryer, callbacks=callbacks)
         self.reformat_text_stage = ReformatTextStage(self.llm_pool, self.retryer, callbacks=callbacks)
         self.clean_for_map_stage = CleanForMapStage(self.llm_pool, self.retryer, callbacks=callbacks)
@@ -120,6 +153,15 @@ class StepRunner:
             )
 
     def run(self):
+        if _LLM_STEPS.intersection(self.cfg.steps):
+            self.executor.warm_up(init=self.llm_pool.prewarm)
+        try:
+            self._run()
+        finally:
+            self.executor.shutdown()
+            self.llm_cache.close()
+
+    def _run(self):
         app = self.cfg.app
         with RichProgressReporter(self.console) as progress:
 
@@ -161,7 +203,11 @@ class StepRunner:
 
             # File-based pipelines
             self._ensure_file_mode()
-            text = self.cfg.input_path.read_text(encoding="utf-8")
+            # only chunk and qa_parse read the raw markdown; other step lists skip loading it,
+            # and so does a chunk step that will be served from debug artifacts
+            chunks_cached = self.cfg.use_debug_io and self.store.exists(ChunkStage.ARTIFACT)
+            needs_text = "qa_parse" in self.cfg.steps or ("chunk" in self.cfg.steps and not chunks_cached)
+            text = self.cfg.input_path.read_text(encoding="utf-8") if needs_text else ""
             base_name = to_camel_nospace(self.cfg.run_name)
             ctx = RunContext(text=text)
 
@@ -174,6 +220,8 @@ class StepRunner:
                     debug=self.debug,
                     use_debug_io=self.cfg.use_debug_io,
                 )
+                if "qa_parse" not in self.cfg.steps:
+                    ctx.text = ""  # release the source text before the LLM-heavy steps
             elif self.cfg.use_debug_io:
                 loaded = self.store.load_debug("chunks.json")
                 if loaded is not None:
@@ -238,6 +286,10 @@ class StepRunner:
                     progress,
                     executor=self.executor,
                     use_debug_io=self.cfg.use_debug_io,
+                    batch_size=self.cfg.tree_batch_size,
+                    batch_token_budget=app.chunk.max_tokens,
+                    dedup_threshold=self.cfg.tree_dedup_threshold,
+                    min_prose_tokens=self.cfg.tree_min_prose_tokens,
                 )
             if "cluster" in self.cfg.steps:
                 ctx = self.cluster_stage.run(
@@ -253,6 +305,8 @@ class StepRunner:
                     progress,
                     executor=self.executor,
                     use_debug_io=self.cfg.use_debug_io,
+                    merge_strategy=self.cfg.merge_strategy,
+                    max_prompt_tokens=self.cfg.merge_max_prompt_tokens,
                 )
             if "refine" in self.cfg.steps:
                 ctx = self.refine_stage.run(
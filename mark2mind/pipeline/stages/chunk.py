@@ -3,7 +3,7 @@ from typing import Dict
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
-from mark2mind.utils.chunker import chunk_markdown
+from mark2mind.utils.chunker import chunk_markdown, dump_chunk_debug
 
 class ChunkStage:
     ARTIFACT = "chunks.json"
@@ -25,8 +25,9 @@ class ChunkStage:
                 return ctx
 
         task = progress.start("Chunking markdown", total=1)
-        ctx.chunks = chunk_markdown(ctx.text, max_tokens=max_tokens, debug=debug, debug_dir=store.debug_dir)
+        ctx.chunks = chunk_markdown(ctx.text, max_tokens=max_tokens)
         if debug:
+            dump_chunk_debug(ctx.chunks, store.debug_dir)
             store.save_debug(self.ARTIFACT, ctx.chunks)
         progress.advance(task); progress.finish(task)
         return ctx
@@ -1,5 +1,7 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
+import os
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
@@ -22,12 +24,19 @@ class ClusterStage:
                 return ctx
 
         progress_task = progress.start("Clustering chunks", total=1)
-        n = len(ctx.chunk_results)
+        # chunks skipped by the tree step carry no tree; keep them out of the clustering
+        results = [r for r in ctx.chunk_results if r.get("tree")]
+        n = len(results)
         if n <= 1:
-            ctx.clustered = [ctx.chunk_results]
+            ctx.clustered = [results] if results else []
         else:
             from mark2mind.utils.clustering import cluster_chunk_trees
-            ctx.clustered = cluster_chunk_trees(ctx.chunk_results, None)
+            if os.getenv("MARK2MIND_CLUSTER_PROCESS", "").strip() == "1":
+                # sklearn/BLAS work in a child process, off the GIL the worker threads share
+                with ProcessPoolExecutor(max_workers=1) as pp:
+                    ctx.clustered = pp.submit(cluster_chunk_trees, results, None).result()
+            else:
+                ctx.clustered = cluster_chunk_trees(results, None)
         store.save_debug(self.ARTIFACT, ctx.clustered)
         progress.advance(progress_task); progress.finish(progress_task)
         return ctx
@@ -1,14 +1,13 @@
 # FILE: mark2mind/pipeline/stages/enrich_notes.py
 from __future__ import annotations
 from typing import Dict, List, Tuple
-from concurrent.futures import as_completed
 import json
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
 from ..core.retry import Retryer
 from ..core.llm_pool import LLMFactoryPool
-from ..core.executor_provider import ExecutorProvider
+from ..core.executor_provider import ExecutorProvider, completed_batches
 from mark2mind.chains.note_generation_chains import NoteLeafChain, NoteBranchChain, PrereqPickChain
 from mark2mind.utils.tree_helper import assign_node_ids
 from mark2mind.utils.slugs import node_slug
@@ -237,10 +236,11 @@ class EnrichMarkmapNotesStage:
             results = {}
             with executor.get() as pool:
                 futs = [pool.submit(gen_leaf, nid) for nid in leaf_ids]
-                for f in as_completed(futs):
-                    nid, (body, summary) = f.result()
-                    results[nid] = (body, summary)
-                    progress.advance(t)
+                for done in completed_batches(futs):
+                    for f in done:
+                        nid, (body, summary) = f.result()
+                        results[nid] = (body, summary)
+                    progress.advance(t, len(done))
             progress.finish(t)
             for nid, (body, summary) in results.items():
                 n = node_lookup[nid]
@@ -321,10 +321,11 @@ class EnrichMarkmapNotesStage:
 
             with executor.get() as pool:
                 futs = [pool.submit(_build_and_pick, nid) for nid in leaf_ids_for_prereq]
-                for f in as_completed(futs):
-                    nid, chosen = f.result()
-                    node_lookup[nid]["_prereq_ids"] = chosen
-                    progress.advance(task)
+                for done in completed_batches(futs):
+                    for f in done:
+                        nid, chosen = f.result()
+                        node_lookup[nid]["_prereq_ids"] = chosen
+                    progress.advance(task, len(done))
             progress.finish(task)
 
         # See-also selection: siblings → parent → cousins (excluding prereqs)
@@ -1,18 +1,62 @@
 from __future__ import annotations
-from concurrent.futures import as_completed
 from typing import Dict, List, Tuple
 import math
+import os
+import sys
+import threading
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
 from ..core.retry import Retryer
 from ..core.llm_pool import LLMFactoryPool
-from ..core.executor_provider import ExecutorProvider
+from ..core.executor_provider import ExecutorProvider, completed_batches
+from ..core.llm_cache import LLMResponseCache
 from mark2mind.chains.map_content_mindmap_chain import ContentMappingChain
 from mark2mind.chains.map_content_mindmap_qa_chain import QAContentMappingChain
-from mark2mind.utils.tree_helper import insert_content_refs_into_tree
+from mark2mind.utils.tree_helper import index_nodes_by_id, insert_content_refs_into_tree
 from mark2mind.config_schema import _warn
 
+def _enrich_qa(m: Dict, b: Dict) -> None:
+    # keep Q + A in the final content_refs, even if mapping used only Q
+    m["q"] = b.get("q") or ""
+    m["a"] = b.get("a") or ""
+    m["type"] = "qa"
+    m["markdown"] = ""
+
+
+def _enrich_code(m: Dict, b: Dict) -> None:
+    m["markdown"] = b.get("markdown") or f"```{b.get('language','')}\n{b.get('text','')}\n```"
+
+
+def _enrich_table(m: Dict, b: Dict) -> None:
+    m["markdown"] = b.get("text", "") or ""
+
+
+def _enrich_image(m: Dict, b: Dict) -> None:
+    # chunker already rendered "![alt](src)"; reuse that string instead of copying a
+    # possibly multi-MB data: URL again whenever it would come out identical
+    md, raw_alt = b.get("markdown"), b.get("alt") or ""
+    if md and raw_alt and raw_alt == raw_alt.strip():
+        m["markdown"] = md
+        return
+    alt = (raw_alt or "image").strip()
+    src = b.get("src", "") or ""
+    m["markdown"] = f"![{alt}]({src})"
+
+
+def _enrich_default(m: Dict, b: Dict) -> None:
+    m["markdown"] = b.get("markdown") or b.get("text") or ""
+
+
+# block type -> enrichment handler for mapped refs (anything else uses _enrich_default)
+_ENRICHERS = {
+    "qa": _enrich_qa,
+    "code": _enrich_code,
+    "table": _enrich_table,
+    "image": _enrich_image,
+}
+
+
 class MapContentStage:
     FINAL_TREE_ARTIFACT = "final_tree.json"
 
@@ -20,18 +64,29 @@ class MapContentStage:
         self,
         llm_pool: LLMFactoryPool,
         retryer: Retryer,
-        callbacks=None):
+        callbacks=None,
+        cache: LLMResponseCache | None = None):
         self.llm_pool = llm_pool
         self.retryer = retryer
         self.callbacks = callbacks
+        self.cache = cache or LLMResponseCache(None, "", enabled=False)
+        self._tls = threading.local()
+
+    def _chain(self, kind: str):
+        # one chain per (worker thread, kind), built lazily around that thread's LLM client
+        chains = getattr(self._tls, "chains", None)
+        if chains is None:
+            chains = self._tls.chains = {}
+        if kind not in chains:
+            cls = QAContentMappingChain if kind == "qa" else ContentMappingChain
+            chains[kind] = cls(self.llm_pool.get(), callbacks=self.callbacks)
+        return chains[kind]
 
     def _make_chain_normal(self):
-        llm = self.llm_pool.get()
-        return ContentMappingChain(llm, callbacks=self.callbacks)
+        return self._chain("normal")
 
     def _make_chain_qa(self):
-        llm = self.llm_pool.get()
-        return QAContentMappingChain(llm, callbacks=self.callbacks)
+        return self._chain("qa")
 
     def _mk_caption(self, b: Dict) -> str:
         if b.get("type") == "image":
@@ -46,6 +101,74 @@ class MapContentStage:
         hp = b.get("heading_path") or []
         return (" / ".join(hp[-2:]) if hp else "Content block")[:160]
 
+    @staticmethod
+    def _shard_by_region(final_tree: Dict, blocks: List[Dict]) -> List[Tuple[Dict, List[Dict]]]:
+        """
+        Group blocks by top-level heading and pair each group with the matching first-level
+        subtree, so a batch only carries the part of the tree it can map onto. Blocks whose
+        top heading matches no subtree stay together with the whole tree. Node ids are global,
+        so refs need no reconciliation afterwards.
+        """
+        def norm(title) -> str:
+            return " ".join(str(title or "").split()).casefold()
+
+        regions = {}
+        for child in final_tree.get("children", []) or []:
+            regions.setdefault(norm(child.get("title")), child)
+        if len(regions) < 2:
+            return [(final_tree, blocks)]
+
+        groups: Dict[str, List[Dict]] = {}
+        for b in blocks:
+            hp = b.get("heading_path") or ()
+            key = norm(hp[0]) if hp else ""
+            groups.setdefault(key if key in regions else "", []).append(b)
+        return [(regions[key] if key else final_tree, items) for key, items in groups.items()]
+
+    @staticmethod
+    def _coalesce_shards(
+        final_tree: Dict, sharded: List[Tuple[Dict, List[Dict]]], batch_size: int
+    ) -> List[Tuple[Dict, List[Dict]]]:
+        """
+        Pack region shards smaller than one batch together, under a shallow copy of the
+        root that holds just their subtrees, so many short top-level sections do not
+        cost one LLM call each.
+        """
+        out: List[Tuple[Dict, List[Dict]]] = []
+        trees: List[Dict] = []
+        items: List[Dict] = []
+
+        def flush():
+            if items:
+                out.append((trees[0] if len(trees) == 1 else {**final_tree, "children": list(trees)}, list(items)))
+                trees.clear(); items.clear()
+
+        for tree, blocks in sharded:
+            if tree is final_tree or len(blocks) >= batch_size:
+                out.append((tree, blocks))
+                continue
+            if len(items) + len(blocks) > batch_size:
+                flush()
+            trees.append(tree)
+            items.extend(blocks)
+        flush()
+        return out
+
+    @staticmethod
+    def _gather(futs: List, progress: ProgressReporter, task) -> List[List[Dict]]:
+        """
+        Wait for (bidx, mapped) batch futures as they complete, advancing progress per
+        completion, and return the mapped lists in batch order. Workers only compute;
+        everything that touches the tree or the shared result list runs on this thread.
+        """
+        slots: List[List[Dict]] = [[] for _ in futs]
+        for done in completed_batches(futs):
+            for f in done:
+                bidx, mapped = f.result()
+                slots[bidx] = mapped
+            progress.advance(task, len(done))
+        return slots
+
     def _choose_batch_size(self, n: int, override: int | None) -> int:
         if override:
             return max(1, int(override))
@@ -66,6 +189,10 @@ class MapContentStage:
         if not ctx.final_tree:
             return ctx
 
+        # snapshot context fields once; they are read again in the worker closures and loops below
+        final_tree = ctx.final_tree
+        chunks = ctx.chunks
+        source_qa_blocks = getattr(ctx, "qa_blocks", []) or []
         qa_only = bool(getattr(ctx, "qa_only_map", False))
 
         supported_types_normal = {"paragraph", "code", "table", "image"}
@@ -73,10 +200,23 @@ class MapContentStage:
         seen = set()
         normal_blocks: List[Dict] = []
         qa_blocks: List[Dict] = []
+        # siblings share one heading_path tuple; ids are interned so every set/dict below
+        # hashes and compares the same string object
+        path_cache: Dict[tuple, tuple] = {}
+
+        def shared_path(b: Dict) -> tuple:
+            hp = tuple(b.get("heading_path") or ())
+            return path_cache.setdefault(hp, hp)
+
+        # element_id -> source block, filled by the queueing pass and reused for enrichment
+        id_to_block: Dict[str, Dict] = {}
 
         def enqueue_normal(b: Dict, ch_i: int | None):
             eid = b.get("element_id")
             btype = b.get("type")
+            if eid:
+                eid = sys.intern(eid)
+                id_to_block.setdefault(eid, b)
             if not eid:
                 sample = b.get("markdown") or b.get("src") or b.get("text") or ""
                 skip_log["no_id"].append({"chunk_index": ch_i, "type": btype, "sample": sample[:200]})
@@ -94,7 +234,7 @@ class MapContentStage:
                 "element_caption": b.get("element_caption") or self._mk_caption(b),
                 "markdown": b.get("markdown") or b.get("text") or b.get("src") or "",
                 "is_atomic": b.get("is_atomic", False),
-                "heading_path": b.get("heading_path", []),
+                "heading_path": shared_path(b),
                 "source_chunk_index": ch_i if ch_i is not None else -1,
             }
             if btype == "image":
@@ -110,7 +250,11 @@ class MapContentStage:
             if (b.get("type") or "").lower() != "qa":
                 return
             eid = b.get("element_id")
-            if not eid or eid in seen:
+            if not eid:
+                return
+            eid = sys.intern(eid)
+            id_to_block[eid] = b
+            if eid in seen:
                 return
             seen.add(eid)
             qa_blocks.append({
@@ -118,99 +262,126 @@ class MapContentStage:
                 "type": "qa",
                 "q": b.get("q") or "",
                 "a": b.get("a") or "",
-                "heading_path": b.get("heading_path", []),
+                "heading_path": shared_path(b),
             })
 
         if not qa_only:
-            for ch_i, ch in enumerate(ctx.chunks):
+            for ch_i, ch in enumerate(chunks):
                 for b in ch.get("blocks", []):
                     enqueue_normal(b, ch_i)
 
-        for b in getattr(ctx, "qa_blocks", []) or []:
+        for b in source_qa_blocks:
             enqueue_qa(b)
 
         store.save_debug("map_skips.json", skip_log)
         store.save_debug("map_queue_normal.json", normal_blocks)
         store.save_debug("map_queue_qa.json", qa_blocks)
 
+        # de-duplicated as batches arrive, so no second copy of the results is built
         mapped_all: List[Dict] = []
-
-        # normal content mapping
-        if normal_blocks and not qa_only:
-            total = len(normal_blocks)
-            batch_size = self._choose_batch_size(total, map_batch_override)
-            num_batches = math.ceil(total / batch_size)
-            batches = [(i // batch_size, normal_blocks[i:i+batch_size]) for i in range(0, total, batch_size)]
-            task_n = progress.start(
-                f"Mapping normal content (≈{batch_size}, {num_batches} batches)", total=num_batches
-            )
-
-            def run_batch_normal(payload: Tuple[int, List[Dict]]):
-                bidx, items = payload
-                chain = self._make_chain_normal()
-                mapped = self.retryer.call(chain.invoke, ctx.final_tree, items, config={"meta": f"map:norm:{bidx+1}/{num_batches}"})
-                mapped = [m for m in mapped if m.get("element_id") and m.get("target_node_id")]
-                return (bidx, mapped)
-
-            results_by_batch: Dict[int, List[Dict]] = {}
-            with executor.get() as pool:
-                futs = {pool.submit(run_batch_normal, item): item[0] for item in batches}
-                for fut in as_completed(futs):
-                    bidx, mapped = fut.result()
-                    results_by_batch[bidx] = mapped
-                    progress.advance(task_n)
-
-            for i in range(num_batches):
-                mapped_all.extend(results_by_batch.get(i, []))
-            progress.finish(task_n)
-
-        # QA mapping
+        seen_ids: set[str] = set()
         qa_mapped_ids: set[str] = set()
-        if qa_blocks:
-            remaining_qa = list(qa_blocks)
-            attempt = 0
-            max_attempts = 3 if qa_only else 1
-            all_qa_ids = {b["element_id"] for b in qa_blocks if b.get("element_id")}
-            while remaining_qa and attempt < max_attempts:
-                attempt += 1
-                total_q = len(remaining_qa)
-                batch_size_q = self._choose_batch_size(total_q, map_batch_override)
-                num_batches_q = math.ceil(total_q / batch_size_q)
-                batches_q = [(i // batch_size_q, remaining_qa[i:i+batch_size_q]) for i in range(0, total_q, batch_size_q)]
-                suffix = f" (retry {attempt-1})" if attempt > 1 else ""
-                task_q = progress.start(
-                    f"Mapping Q&A (≈{batch_size_q}, {num_batches_q} batches){suffix}", total=num_batches_q
+
+        def collect(mapped: List[Dict]) -> None:
+            for m in mapped:
+                eid = m["element_id"] = sys.intern(m["element_id"])
+                if eid not in seen_ids:
+                    seen_ids.add(eid)
+                    mapped_all.append(m)
+
+        # One pool for the whole stage: normal batches are submitted up front so they
+        # overlap with the Q&A batches instead of running in a separate pool first.
+        with executor.get() as pool:
+            normal_results = None
+            task_n = None
+            if normal_blocks and not qa_only:
+                total = len(normal_blocks)
+                batch_size = self._choose_batch_size(total, map_batch_override)
+                if os.getenv("MARK2MIND_MAP_SHARD", "1").strip() != "0":
+                    sharded = self._coalesce_shards(
+                        final_tree, self._shard_by_region(final_tree, normal_blocks), batch_size
+                    )
+                else:
+                    sharded = [(final_tree, normal_blocks)]
+                batches = [
+                    (bidx, tree, items)
+                    for bidx, (tree, items) in enumerate(
+                        (tree, blocks[i:i+batch_size])
+                        for tree, blocks in sharded
+                        for i in range(0, len(blocks), batch_size)
+                    )
+                ]
+                num_batches = len(batches)
+                task_n = progress.start(
+                    f"Mapping normal content (≈{batch_size}, {num_batches} batches)", total=num_batches
                 )
 
-                def run_batch_qa(payload: Tuple[int, List[Dict]]):
-                    bidx, items = payload
-                    chain = self._make_chain_qa()
-                    mapped = self.retryer.call(
-                        chain.invoke,
-                        ctx.final_tree,
-                        items,
-                        config={"meta": f"map:qa:{attempt}:{bidx+1}/{num_batches_q}"},
+                def run_batch_normal(payload: Tuple[int, Dict, List[Dict]]):
+                    bidx, tree, items = payload
+                    chain = self._make_chain_normal()
+                    mapped = self.cache.call(
+                        "ContentMappingChain", "map_content", [tree, items],
+                        lambda: self.retryer.call(chain.invoke, tree, items, config={"meta": f"map:norm:{bidx+1}/{num_batches}"}),
                     )
                     mapped = [m for m in mapped if m.get("element_id") and m.get("target_node_id")]
                     return (bidx, mapped)
 
-                results_by_batch_q: Dict[int, List[Dict]] = {}
-                with executor.get() as pool:
-                    futs = {pool.submit(run_batch_qa, item): item[0] for item in batches_q}
-                    for fut in as_completed(futs):
-                        bidx, mapped = fut.result()
-                        results_by_batch_q[bidx] = mapped
-                        progress.advance(task_q)
+                normal_results = [pool.submit(run_batch_normal, b) for b in batches]
 
-                for i in range(num_batches_q):
-                    mapped_all.extend(results_by_batch_q.get(i, []))
-                    for m in results_by_batch_q.get(i, []):
-                        if m.get("element_id"):
-                            qa_mapped_ids.add(m["element_id"])
-                progress.finish(task_q)
+            def drain_normal():
+                nonlocal normal_results
+                if normal_results is None:
+                    return
+                for mapped in self._gather(normal_results, progress, task_n):
+                    collect(mapped)
+                progress.finish(task_n)
+                normal_results = None
 
-                remaining_qa = [b for b in qa_blocks if b.get("element_id") not in qa_mapped_ids]
+            # QA mapping
+            if qa_blocks:
+                remaining_qa = list(qa_blocks)
+                attempt = 0
+                max_attempts = 3 if qa_only else 1
+                all_qa_ids = {b["element_id"] for b in qa_blocks if b.get("element_id")}
+                while remaining_qa and attempt < max_attempts:
+                    attempt += 1
+                    total_q = len(remaining_qa)
+                    batch_size_q = self._choose_batch_size(total_q, map_batch_override)
+                    num_batches_q = math.ceil(total_q / batch_size_q)
+                    batches_q = [(i // batch_size_q, remaining_qa[i:i+batch_size_q]) for i in range(0, total_q, batch_size_q)]
+                    suffix = f" (retry {attempt-1})" if attempt > 1 else ""
+                    task_q = progress.start(
+                        f"Mapping Q&A (≈{batch_size_q}, {num_batches_q} batches){suffix}", total=num_batches_q
+                    )
+
+                    def run_batch_qa(payload: Tuple[int, List[Dict]]):
+                        bidx, items = payload
+                        chain = self._make_chain_qa()
+                        mapped = self.cache.call(
+                            "QAContentMappingChain", "map_content_qa", [final_tree, items],
+                            lambda: self.retryer.call(
+                                chain.invoke,
+                                final_tree,
+                                items,
+                                config={"meta": f"map:qa:{attempt}:{bidx+1}/{num_batches_q}"},
+                            ),
+                        )
+                        mapped = [m for m in mapped if m.get("element_id") and m.get("target_node_id")]
+                        return (bidx, mapped)
+
+                    qa_results = [pool.submit(run_batch_qa, b) for b in batches_q]
+                    # keep normal refs ahead of Q&A refs in mapped_all
+                    drain_normal()
+                    for mapped in self._gather(qa_results, progress, task_q):
+                        collect(mapped)
+                        qa_mapped_ids.update(m["element_id"] for m in mapped)
+                    progress.finish(task_q)
+
+                    remaining_qa = [b for b in qa_blocks if b.get("element_id") not in qa_mapped_ids]
+
+            drain_normal()
 
+        if qa_blocks:
             unmapped = sorted(all_qa_ids - qa_mapped_ids)
             store.save_debug("map_qa_coverage.json", {
                 "total_questions": len(all_qa_ids),
@@ -223,54 +394,32 @@ class MapContentStage:
                 _warn(f"{len(unmapped)} Q&A items remain unmapped after {max_attempts} attempts.")
 
         if not mapped_all:
-            store.save_debug(self.FINAL_TREE_ARTIFACT, ctx.final_tree)
+            store.save_debug(self.FINAL_TREE_ARTIFACT, final_tree)
             return ctx
 
-        # de-dup
-        deduped, seen_ids = [], set()
-        for m in mapped_all:
-            if m["element_id"] in seen_ids:
-                continue
-            seen_ids.add(m["element_id"])
-            deduped.append(m)
+        # enrich markdown for mapped refs from the blocks indexed while queueing
+        # index the tree on the pool while this thread enriches the refs
+        index_fut = executor.acquire().submit(index_nodes_by_id, final_tree)
 
-        # enrich markdown for non-QA refs
-        id_to_block: Dict[str, Dict] = {}
-        for ch in ctx.chunks:
-            for b in ch.get("blocks", []):
-                if eid := b.get("element_id"):
-                    id_to_block[eid] = b
-        for b in getattr(ctx, "qa_blocks", []) or []:
-            if eid := b.get("element_id"):
-                id_to_block[eid] = b
-
-        task_enrich = progress.start("Enriching mapped refs", total=len(deduped))
-        for m in deduped:
+        # group refs by handler once, then run each handler over its group and advance per group
+        task_enrich = progress.start("Enriching mapped refs", total=len(mapped_all))
+        by_handler: Dict = {}
+        unmatched = 0
+        for m in mapped_all:
             b = id_to_block.get(m["element_id"])
-            if not b:
-                progress.advance(task_enrich)
+            if b is None:
+                unmatched += 1
                 continue
-            btype = (b.get("type") or "").lower()
-            if btype == "qa":
-                # keep Q + A in the final content_refs, even if mapping used only Q
-                m["q"] = b.get("q") or ""
-                m["a"] = b.get("a") or ""
-                m["type"] = "qa"
-                m["markdown"] = ""
-            elif btype == "code":
-                m["markdown"] = b.get("markdown") or f"```{b.get('language','')}\n{b.get('text','')}\n```"
-            elif btype == "table":
-                m["markdown"] = b.get("text", "") or ""
-            elif btype == "image":
-                alt = (b.get("alt") or "image").strip()
-                src = b.get("src", "") or ""
-                m["markdown"] = f"![{alt}]({src})"
-            else:
-                m["markdown"] = b.get("markdown") or b.get("text") or ""
-            progress.advance(task_enrich)
+            handler = _ENRICHERS.get((b.get("type") or "").lower(), _enrich_default)
+            by_handler.setdefault(handler, []).append((m, b))
+        for handler, pairs in by_handler.items():
+            for m, b in pairs:
+                handler(m, b)
+            progress.advance(task_enrich, len(pairs))
+        progress.advance(task_enrich, unmatched)
         progress.finish(task_enrich)
 
-        store.save_debug("map_mapped_final.json", deduped)
-        insert_content_refs_into_tree(ctx.final_tree, deduped)
-        store.save_debug(self.FINAL_TREE_ARTIFACT, ctx.final_tree)
+        store.save_debug("map_mapped_final.json", mapped_all)
+        insert_content_refs_into_tree(final_tree, mapped_all, index=index_fut.result())
+        store.save_debug(self.FINAL_TREE_ARTIFACT, final_tree)
         return ctx
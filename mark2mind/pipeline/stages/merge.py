@@ -1,63 +1,70 @@
 from __future__ import annotations
-from concurrent.futures import as_completed
-from typing import Dict, List, Tuple
+from typing import AbstractSet, Dict, List
+import json
+import threading
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
 from ..core.retry import Retryer
 from ..core.llm_pool import LLMFactoryPool
 from ..core.executor_provider import ExecutorProvider
+from ..core.llm_cache import LLMResponseCache
+from ..core.pairwise import reduce_pairwise
+from ..core.config import MergeStrategy
 from mark2mind.chains.merge_tree_chain import TreeMergeChain
 
 class MergeStage:
     ARTIFACT = "merged_clusters.json"
 
-    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None):
+    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None, cache: LLMResponseCache | None = None):
         self.llm_pool = llm_pool
         self.retryer = retryer
         self.callbacks = callbacks
+        self.cache = cache or LLMResponseCache(None, "", enabled=False)
+        self._tls = threading.local()
 
     def _make_chain(self):
-        llm = self.llm_pool.get()
-        return TreeMergeChain(llm, callbacks=self.callbacks)
+        # built once per worker thread around that thread's LLM client
+        chain = getattr(self._tls, "chain", None)
+        if chain is None:
+            chain = self._tls.chain = TreeMergeChain(self.llm_pool.get(), callbacks=self.callbacks)
+        return chain
 
-    def _merge_round(self, trees: List[Dict], chain: TreeMergeChain, tag_prefix: str) -> List[Dict]:
-        pairs = [(trees[i], trees[i + 1]) for i in range(0, len(trees) - 1, 2)]
-        leftovers = [trees[-1]] if len(trees) % 2 == 1 else []
-        merged_by_idx = []
-        for j, (a, b) in enumerate(pairs):
-            merged = self.retryer.call(chain.invoke, a, b, config={"meta": f"{tag_prefix}:{j}"})
-            merged_by_idx.append(merged)
-        return merged_by_idx + leftovers
+    def _use_nway(self, trees: List[Dict], strategy: MergeStrategy, max_prompt_tokens: int) -> bool:
+        if len(trees) <= 2 or strategy == "pairwise":
+            return False
+        if strategy == "nway":
+            return True
+        # auto: ~4 chars per token is close enough to decide whether one prompt fits
+        est_tokens = sum(len(json.dumps(t, ensure_ascii=False)) for t in trees) // 4
+        return est_tokens < max_prompt_tokens
 
-    def _merge_group_parallel(self, cid_group: Tuple[int, List[Dict]], chain: TreeMergeChain, executor: ExecutorProvider):
-        cid, group = cid_group
-        trees = [i["tree"] for i in group if i.get("tree")]
-        round_idx = 0
-        while len(trees) > 1:
-            pairs = [(trees[i], trees[i + 1]) for i in range(0, len(trees) - 1, 2)]
-            leftovers = [trees[-1]] if len(trees) % 2 == 1 else []
-
-            def merge_pair(j_ab):
-                j, (a, b) = j_ab
-                local_chain = self._make_chain()
-                return self.retryer.call(local_chain.invoke, a, b, config={"meta": f"merge:{cid}:{round_idx}:{j}"})
-
-            if pairs:
-                merged_by_idx = {}
-                with executor.get() as pool:
-                    fut_map = {pool.submit(merge_pair, (j, ab)): j for j, ab in enumerate(pairs)}
-                    for f in as_completed(fut_map):
-                        j = fut_map[f]
-                        merged_by_idx[j] = f.result()
-                merged = [merged_by_idx[j] for j in range(len(pairs))]
-            else:
-                merged = []
+    def _merge_groups_parallel(
+        self,
+        groups: List[List[Dict]],
+        pool,
+        on_group_done,
+        skip: AbstractSet[int] = frozenset(),
+    ) -> List[Dict | None]:
+        """
+        Pairwise-merge every cluster down to one tree on a single shared pool.
 
-            trees = merged + leftovers
-            round_idx += 1
+        Pairs from all clusters share the pool and each merge is submitted as soon as
+        its two inputs exist (no per-round barrier). Clusters in ``skip`` are left
+        untouched (their slot in the result is None).
+        """
+        def merge_pair(cid: int, round_idx: int, j: int, a: Dict, b: Dict) -> Dict:
+            local_chain = self._make_chain()
+            return self.cache.call(
+                "TreeMergeChain", "merge_tree", [a, b],
+                lambda: self.retryer.call(local_chain.invoke, a, b, config={"meta": f"merge:{cid}:{round_idx}:{j}"}),
+            )
 
-        return trees[0] if trees else None
+        return reduce_pairwise(
+            [() if cid in skip else g for cid, g in enumerate(groups)],
+            lambda cid, round_idx, j, a, b: pool.submit(merge_pair, cid, round_idx, j, a, b),
+            lambda cid: None if cid in skip else on_group_done(),
+        )
 
     def run(
         self,
@@ -67,6 +74,8 @@ class MergeStage:
         *,
         executor: ExecutorProvider,
         use_debug_io: bool,
+        merge_strategy: MergeStrategy = "auto",
+        max_prompt_tokens: int = 32000,
     ) -> RunContext:
         if use_debug_io:
             loaded = store.load_debug(self.ARTIFACT)
@@ -74,15 +83,43 @@ class MergeStage:
                 ctx.cluster_trees = loaded
                 return ctx
 
-        chain = self._make_chain()
-        items = list(enumerate(ctx.clustered))
-        task = progress.start("Merging clusters", total=len(items))
+        groups = [[i["tree"] for i in group if i.get("tree")] for group in ctx.clustered]
+        task = progress.start("Merging clusters", total=len(groups))
+
+        def merge_many(cid: int, trees: List[Dict]) -> Dict:
+            chain = self._make_chain()
+            return self.cache.call(
+                "TreeMergeChain", "merge_trees", trees,
+                lambda: self.retryer.call(chain.invoke_many, trees, config={"meta": f"merge:{cid}:nway"}),
+            )
 
-        trees: List[Dict] = []
         with executor.get() as pool:
-            futs = {pool.submit(self._merge_group_parallel, item, chain, executor): item for item in items}
-            for fut in as_completed(futs):
-                trees.append(fut.result()); progress.advance(task)
+            # one N-way call per cluster where it fits; the rest fall back to the pairwise tournament
+            nway_futs = {
+                cid: pool.submit(merge_many, cid, trees)
+                for cid, trees in enumerate(groups)
+                if self._use_nway(trees, merge_strategy, max_prompt_tokens)
+            }
+            trees = self._merge_groups_parallel(
+                groups, pool, lambda: progress.advance(task), skip=nway_futs.keys()
+            )
+            failed = set()
+            for cid, fut in nway_futs.items():
+                try:
+                    trees[cid] = fut.result()
+                except Exception as e:
+                    # the N-way call gave up after retries; reduce this cluster pairwise instead
+                    print(f"[merge] cluster {cid}: n-way merge failed ({type(e).__name__}: {e}); falling back to pairwise")
+                    failed.add(cid)
+                    continue
+                progress.advance(task)
+            if failed:
+                retried = self._merge_groups_parallel(
+                    groups, pool, lambda: progress.advance(task),
+                    skip=frozenset(range(len(groups))) - failed,
+                )
+                for cid in failed:
+                    trees[cid] = retried[cid]
 
         ctx.cluster_trees = [t for t in trees if t]
         store.save_debug(self.ARTIFACT, ctx.cluster_trees)
@@ -1,30 +1,91 @@
 from __future__ import annotations
-from concurrent.futures import as_completed
-from typing import Dict, List, Tuple
+from typing import Dict, List
+import os
+import threading
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
 from ..core.retry import Retryer
 from ..core.llm_pool import LLMFactoryPool
-from ..core.executor_provider import ExecutorProvider
+from ..core.executor_provider import ExecutorProvider, completed_batches
+from ..core.llm_cache import LLMResponseCache
 
 from mark2mind.chains.generate_questions_chain import GenerateQuestionsChain
 from mark2mind.chains.answer_questions_chain import AnswerQuestionsChain
+from mark2mind.utils.dedup import exact_duplicate_leaders
 
 class QAStage:
     ARTIFACT = "chunks_with_qa.json"
 
-    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None):
+    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None, cache: LLMResponseCache | None = None):
         self.llm_pool = llm_pool
         self.retryer = retryer
         self.callbacks = callbacks
+        self.cache = cache or LLMResponseCache(None, "", enabled=False)
+        self._tls = threading.local()
 
     def _make_chains(self):
-        llm = self.llm_pool.get()
-        return {
-            "qa_q": GenerateQuestionsChain(llm, callbacks=self.callbacks),
-            "qa_a": AnswerQuestionsChain(llm, callbacks=self.callbacks),
-        }
+        # built once per worker thread around that thread's LLM client
+        chains = getattr(self._tls, "chains", None)
+        if chains is None:
+            llm = self.llm_pool.get()
+            chains = self._tls.chains = {
+                "qa_q": GenerateQuestionsChain(llm, callbacks=self.callbacks),
+                "qa_a": AnswerQuestionsChain(llm, callbacks=self.callbacks),
+            }
+        return chains
+
+    @staticmethod
+    def _attach_answers(chunk: Dict, answers: List[Dict]) -> Dict:
+        if not answers:
+            for b in chunk["blocks"]:
+                b.setdefault("qa_pairs", [])
+            return chunk
+        # one pass: make sure every block has a list and index it by element id
+        id_to_pairs = {b["element_id"]: b.setdefault("qa_pairs", []) for b in chunk["blocks"]}
+        for qa in answers:
+            pairs = id_to_pairs.get(qa.get("element_id"))
+            if pairs is not None:
+                pairs.append(qa)
+        return chunk
+
+    @staticmethod
+    def _remap_answers(answers: List[Dict], src: Dict, dst: Dict) -> List[Dict]:
+        # identical chunks line up block by block; move answers onto dst's element ids
+        id_map = {a["element_id"]: b["element_id"] for a, b in zip(src["blocks"], dst["blocks"])}
+        return [{**qa, "element_id": id_map.get(qa.get("element_id"), qa.get("element_id"))} for qa in answers]
+
+    def _run_batched(self, chunks: List[Dict], executor: ExecutorProvider) -> List[List[Dict]]:
+        """
+        MARK2MIND_BATCH_LLM=1: one Runnable.batch for all questions, then one for all answers.
+        Each batched item still waits on the Retryer's rate bucket and in-flight cap.
+        Cache hits are skipped; calls that fail inside the batch are retried one by one.
+        """
+        chains = self._make_chains()
+        limit = executor.max_workers
+
+        questions = [self.cache.lookup("GenerateQuestionsChain", "qa_generate", c) for c in chunks]
+        todo = [i for i, q in enumerate(questions) if q is None]
+        fresh = chains["qa_q"].invoke_many([chunks[i] for i in todo], config={"meta": "qa-q:batch"}, max_concurrency=limit, gate=self.retryer.gated) if todo else []
+        for i, q in zip(todo, fresh):
+            if q is None:
+                q = self.retryer.call(chains["qa_q"].invoke, chunks[i], config={"meta": f"qa-q:{i}"})
+            self.cache.remember("GenerateQuestionsChain", "qa_generate", chunks[i], q)
+            questions[i] = q
+
+        answers = [self.cache.lookup("AnswerQuestionsChain", "qa_answer", [c, q]) for c, q in zip(chunks, questions)]
+        todo = [i for i, a in enumerate(answers) if a is None]
+        fresh = chains["qa_a"].invoke_many(
+            [chunks[i] for i in todo], [questions[i] for i in todo], config={"meta": "qa-a:batch"}, max_concurrency=limit,
+            gate=self.retryer.gated,
+        ) if todo else []
+        for i, a in zip(todo, fresh):
+            if a is None:
+                a = self.retryer.call(chains["qa_a"].invoke, chunks[i], questions[i], config={"meta": f"qa-a:{i}"})
+            self.cache.remember("AnswerQuestionsChain", "qa_answer", [chunks[i], questions[i]], a)
+            answers[i] = a
+
+        return answers
 
     def run(
         self,
@@ -41,31 +102,51 @@ class QAStage:
                 ctx.chunks = loaded
                 return ctx
 
-        items = list(enumerate(ctx.chunks))
+        chunks = ctx.chunks
+        items = list(enumerate(chunks))
         task = progress.start("Q&A per chunk", total=len(items))
 
-        def add_qa(idx_chunk):
+        # chunks with identical block text are answered once and the result fanned out
+        leaders = exact_duplicate_leaders(
+            ["\x00".join(b.get("text") or b.get("markdown") or "" for b in c.get("blocks", [])) for c in chunks]
+        )
+        unique = [it for it in items if leaders[it[0]] == it[0]]
+
+        def qa_for(idx_chunk) -> List[Dict]:
             idx, chunk = idx_chunk
             chains = self._make_chains()
-            questions = self.retryer.call(chains["qa_q"].invoke, chunk, config={"meta": f"qa-q:{idx}"})
-            answers = self.retryer.call(chains["qa_a"].invoke, chunk, questions, config={"meta": f"qa-a:{idx}"})
-            id_map = {b["element_id"]: b for b in chunk["blocks"]}
-            for b in chunk["blocks"]:
-                b.setdefault("qa_pairs", [])
-            for qa in answers:
-                eid = qa.get("element_id")
-                if eid in id_map:
-                    id_map[eid]["qa_pairs"].append(qa)
-            return (idx, chunk)
-
-        updated: List[Tuple[int, Dict]] = []
-        with executor.get() as pool:
-            futures = {pool.submit(add_qa, item): item for item in items}
-            for fut in as_completed(futures):
-                updated.append(fut.result())
+            questions = self.cache.call(
+                "GenerateQuestionsChain", "qa_generate", chunk,
+                lambda: self.retryer.call(chains["qa_q"].invoke, chunk, config={"meta": f"qa-q:{idx}"}),
+            )
+            return self.cache.call(
+                "AnswerQuestionsChain", "qa_answer", [chunk, questions],
+                lambda: self.retryer.call(chains["qa_a"].invoke, chunk, questions, config={"meta": f"qa-a:{idx}"}),
+            )
+
+        answers_by_idx: Dict[int, List[Dict]] = {}
+        if os.getenv("MARK2MIND_BATCH_LLM", "").strip() == "1":
+            answers = self._run_batched([c for _, c in unique], executor)
+            answers_by_idx = {idx: a for (idx, _), a in zip(unique, answers)}
+            progress.advance(task, len(unique))
+        else:
+            with executor.get() as pool:
+                futs = {pool.submit(qa_for, it): it[0] for it in unique}
+                for done in completed_batches(futs):
+                    for fut in done:
+                        answers_by_idx[futs[fut]] = fut.result()
+                    progress.advance(task, len(done))
+
+        updated: List[Dict] = []
+        for idx, chunk in items:
+            lead = leaders[idx]
+            answers = answers_by_idx[lead]
+            if lead != idx:
+                answers = self._remap_answers(answers, chunks[lead], chunk)
                 progress.advance(task)
+            updated.append(self._attach_answers(chunk, answers))
 
-        ctx.chunks = [chunk for _, chunk in sorted(updated, key=lambda x: x[0])]
+        ctx.chunks = updated
         store.save_debug(self.ARTIFACT, ctx.chunks)
         progress.finish(task)
         return ctx
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from concurrent.futures import as_completed
+import threading
 from typing import Dict, List
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
@@ -7,6 +7,8 @@ from ..core.progress import ProgressReporter
 from ..core.retry import Retryer
 from ..core.llm_pool import LLMFactoryPool
 from ..core.executor_provider import ExecutorProvider
+from ..core.llm_cache import LLMResponseCache
+from ..core.pairwise import reduce_pairwise
 from mark2mind.chains.merge_tree_chain import TreeMergeChain
 from mark2mind.chains.refine_tree_chain import TreeRefineChain
 from mark2mind.utils.tree_helper import assign_node_ids
@@ -14,40 +16,48 @@ from mark2mind.utils.tree_helper import assign_node_ids
 class RefineStage:
     ARTIFACT = "refined_tree.json"
 
-    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None):
+    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None, cache: LLMResponseCache | None = None):
         self.llm_pool = llm_pool
         self.retryer = retryer
         self.callbacks = callbacks
-    def _make_chains(self):
-        llm = self.llm_pool.get()
-        return TreeMergeChain(llm, callbacks=self.callbacks), TreeRefineChain(llm, callbacks=self.callbacks)
+        self.cache = cache or LLMResponseCache(None, "", enabled=False)
+        self._tls = threading.local()
 
-    def _merge_all_parallel(self, trees: List[Dict], merge_chain: TreeMergeChain, executor: ExecutorProvider):
-        cur = [t for t in trees if t]
-        round_idx = 0
-        while len(cur) > 1:
-            pairs = [(cur[i], cur[i + 1]) for i in range(0, len(cur) - 1, 2)]
-            leftovers = [cur[-1]] if len(cur) % 2 == 1 else []
+    def _make_chains(self):
+        # built once per worker thread around that thread's LLM client
+        chains = getattr(self._tls, "chains", None)
+        if chains is None:
+            llm = self.llm_pool.get()
+            chains = self._tls.chains = (
+                TreeMergeChain(llm, callbacks=self.callbacks),
+                TreeRefineChain(llm, callbacks=self.callbacks),
+            )
+        return chains
 
-            def merge_pair(j_ab):
-                j, (a, b) = j_ab
-                local_merge_chain, _ = self._make_chains()
-                return self.retryer.call(local_merge_chain.invoke, a, b, config={"meta": f"merge:refine:{round_idx}:{j}"})
+    def _merge_all_parallel(self, trees: List[Dict], executor: ExecutorProvider):
+        """
+        Pairwise reduction without per-round barriers: each merge is submitted as soon
+        as both of its inputs are ready, so later rounds overlap with stragglers.
+        """
+        trees = [t for t in trees if t]
+        if len(trees) <= 1:
+            return trees[0] if trees else None
 
-            if pairs:
-                merged_by_idx = {}
-                with executor.get() as pool:
-                    fut_map = {pool.submit(merge_pair, (j, ab)): j for j, ab in enumerate(pairs)}
-                    for f in as_completed(fut_map):
-                        j = fut_map[f]; merged_by_idx[j] = f.result()
-                merged = [merged_by_idx[j] for j in range(len(pairs))]
-            else:
-                merged = []
+        def merge_pair(round_idx: int, j: int, a: Dict, b: Dict):
+            local_merge_chain, _ = self._make_chains()
+            return self.cache.call(
+                "TreeMergeChain", "merge_tree", [a, b],
+                lambda: self.retryer.call(local_merge_chain.invoke, a, b, config={"meta": f"merge:refine:{round_idx}:{j}"}),
+            )
 
-            cur = merged + leftovers
-            round_idx += 1
+        if len(trees) == 2:
+            # a single merge: run it on this thread, no pool round trip
+            return merge_pair(0, 0, trees[0], trees[1])
 
-        return cur[0]
+        pool = executor.acquire()
+        return reduce_pairwise(
+            [trees], lambda _gid, round_idx, j, a, b: pool.submit(merge_pair, round_idx, j, a, b)
+        )[0]
 
     def run(
         self,
@@ -59,23 +69,26 @@ class RefineStage:
         use_debug_io: bool,
     ) -> RunContext:
         if use_debug_io:
-            loaded = store.load_debug(self.ARTIFACT)
+            loaded = store.load_debug_fast(self.ARTIFACT)
             if loaded is not None:
                 ctx.final_tree = loaded
                 return ctx
 
-        merge_chain, refine_chain = self._make_chains()
+        _, refine_chain = self._make_chains()
 
         task = progress.start("Refining", total=2)
-        merged = self._merge_all_parallel(ctx.cluster_trees, merge_chain, executor)
+        merged = self._merge_all_parallel(ctx.cluster_trees, executor)
         progress.advance(task)
         if not merged:
             progress.finish(task)
             return ctx
 
-        refined = self.retryer.call(refine_chain.invoke, merged)
+        refined = self.cache.call(
+            "TreeRefineChain", "refine_tree", merged, lambda: self.retryer.call(refine_chain.invoke, merged)
+        )
         progress.advance(task); progress.finish(task)
         assign_node_ids(refined)
         ctx.final_tree = refined
         store.save_debug(self.ARTIFACT, refined)
+        store.save_debug_fast(self.ARTIFACT, refined)
         return ctx
@@ -1,13 +1,12 @@
 
 from __future__ import annotations
-from concurrent.futures import as_completed
 from typing import List, Tuple, Dict
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
 from ..core.retry import Retryer
 from ..core.llm_pool import LLMFactoryPool
-from ..core.executor_provider import ExecutorProvider
+from ..core.executor_provider import ExecutorProvider, completed_batches
 from mark2mind.chains.reformat_text_chain import ReformatTextChain
 
 class ReformatTextStage:
@@ -64,9 +63,9 @@ class ReformatTextStage:
         outputs: List[Dict] = []
         with executor.get() as pool:
             futs = {pool.submit(process, it): it[0] for it in items}
-            for fut in as_completed(futs):
-                outputs.append(fut.result())
-                progress.advance(task)
+            for done in completed_batches(futs):
+                outputs.extend(fut.result() for fut in done)
+                progress.advance(task, len(done))
 
         progress.finish(task)
 
@@ -25,10 +25,10 @@ class SubtitlesListStage:
         task = progress.start(f"Listing subtitles in: {list_dir}", total=1)
         out = list_subtitle_files(list_dir, manifest_path, enable_html=enable_html)
         # Also mirror into workspace relative (if possible)
-        p = Path(out)
+        p = Path(out).resolve()  # workspace_dir is resolved; compare like with like
         if p.exists():
             rel = p.name if p.parent == store.workspace_dir else f"subs/{p.name}"
-            store.write_text(rel, p.read_text(encoding="utf-8"))
+            store.copy_file(rel, p, link=True)  # same inode when colocated, copy otherwise
         progress.advance(task); progress.finish(task)
         return ctx
 
@@ -52,7 +52,7 @@ class SubtitlesMergeStage:
             raise FileNotFoundError(f"Manifest not found: {manifest_path}\n"
                                     "Hint: run subs_list first to generate it.")
         out = merge_from_list(manifest_path, output_md, enable_html=enable_html)
-        p = Path(out)
-        store.write_text(p.name, p.read_text(encoding="utf-8"))
+        p = Path(out).resolve()
+        store.copy_file(p.name, p)
         progress.advance(task); progress.finish(task)
         return ctx
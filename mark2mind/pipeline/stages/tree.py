@@ -1,33 +1,68 @@
 from __future__ import annotations
-from concurrent.futures import as_completed
 from collections import Counter
+import copy
+import threading
 from typing import Dict, List, Tuple
 from ..core.context import RunContext
 from ..core.artifacts import ArtifactStore
 from ..core.progress import ProgressReporter
 from ..core.retry import Retryer
 from ..core.llm_pool import LLMFactoryPool
-from ..core.executor_provider import ExecutorProvider
+from ..core.executor_provider import ExecutorProvider, completed_batches
+from ..core.llm_cache import LLMResponseCache
 from mark2mind.chains.generate_tree_chain import ChunkTreeChain
+from mark2mind.utils.dedup import near_duplicate_leaders
 
 class TreeStage:
     ARTIFACT = "chunk_trees.json"
+    PARTIAL_ARTIFACT = "chunk_trees.partial.jsonl"
 
-    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None):
+    def __init__(self, llm_pool: LLMFactoryPool, retryer: Retryer, callbacks=None, cache: LLMResponseCache | None = None):
         self.llm_pool = llm_pool
         self.retryer = retryer
         self.callbacks = callbacks
+        self.cache = cache or LLMResponseCache(None, "", enabled=False)
+        self._tls = threading.local()
 
     def _make_chain(self):
-        llm = self.llm_pool.get()
-        return ChunkTreeChain(llm, callbacks=self.callbacks)
+        # built once per worker thread around that thread's LLM client
+        chain = getattr(self._tls, "chain", None)
+        if chain is None:
+            chain = self._tls.chain = ChunkTreeChain(self.llm_pool.get(), callbacks=self.callbacks)
+        return chain
 
     def _chunk_heading_summary(self, chunk: Dict) -> List[str]:
-        c = Counter()
+        # token weight per heading path, keyed by tuple; only the top 3 get joined into strings
+        weights: Counter = Counter()
         for b in chunk.get("blocks", []):
-            path = " › ".join(b.get("heading_path") or [])
-            c[path] += int(b.get("token_count", 0)) or 1
-        return [p for p,_ in c.most_common(3)]
+            weights[tuple(b.get("heading_path") or ())] += int(b.get("token_count", 0)) or 1
+        return [" › ".join(k) for k, _ in weights.most_common(3)]
+
+    @staticmethod
+    def _prose_tokens(chunk: Dict) -> int:
+        return sum(int(b.get("token_count", 0)) for b in chunk.get("blocks", []) if b.get("type") == "paragraph")
+
+    @staticmethod
+    def _chunk_text(chunk: Dict) -> str:
+        return "\n".join(b.get("text") or b.get("markdown") or "" for b in chunk.get("blocks", []))
+
+    def _micro_batches(
+        self, items: List[Tuple[int, Dict]], batch_size: int, token_budget: int | None
+    ) -> List[List[Tuple[int, Dict]]]:
+        """Group consecutive chunks into batches of <= batch_size whose tokens fit token_budget."""
+        batches: List[List[Tuple[int, Dict]]] = []
+        cur: List[Tuple[int, Dict]] = []
+        cur_tokens = 0
+        for idx, chunk in items:
+            n = int((chunk.get("metadata") or {}).get("token_count", 0))
+            if cur and (len(cur) >= batch_size or (token_budget and cur_tokens + n > token_budget)):
+                batches.append(cur)
+                cur, cur_tokens = [], 0
+            cur.append((idx, chunk))
+            cur_tokens += n
+        if cur:
+            batches.append(cur)
+        return batches
 
     def run(
         self,
@@ -37,9 +72,13 @@ class TreeStage:
         *,
         executor: ExecutorProvider,
         use_debug_io: bool,
+        batch_size: int = 1,
+        batch_token_budget: int | None = None,
+        dedup_threshold: float = 0.0,
+        min_prose_tokens: int = 0,
     ) -> RunContext:
         if use_debug_io:
-            loaded = store.load_debug(self.ARTIFACT)
+            loaded = store.load_debug_fast(self.ARTIFACT)
             if loaded is not None:
                 ctx.chunk_results = loaded
                 return ctx
@@ -47,11 +86,7 @@ class TreeStage:
         items = list(enumerate(ctx.chunks))
         task = progress.start("Trees per chunk", total=len(items))
 
-        def process(idx_chunk):
-            idx, chunk = idx_chunk
-            # Build a fresh chain in this worker/thread
-            chain = self._make_chain()
-            out = self.retryer.call(chain.invoke, chunk, config={"meta": f"tree:{idx}"})
+        def finish(chunk: Dict, out: Dict) -> Dict:
             return {
                 **out,
                 "metadata": {
@@ -60,14 +95,83 @@ class TreeStage:
                 }
             }
 
+        def process(batch: List[Tuple[int, Dict]]) -> List[Dict]:
+            # Build a fresh chain in this worker/thread
+            chain = self._make_chain()
+            blocks = [chunk.get("blocks", []) for _, chunk in batch]
+            outs: List[Dict | None] = [None] * len(batch)
+            if len(batch) > 1:
+                # a batched reply comes from a different prompt over the whole batch, so it is
+                # cached under the batch chain and the full batch payload, never per chunk
+                hit = self.cache.lookup("ChunkTreeBatchChain", "chunk_tree", blocks)
+                if hit is not None:
+                    outs = hit
+                else:
+                    first, last = batch[0][0], batch[-1][0]
+                    try:
+                        outs = self.retryer.call(
+                            chain.invoke_batch, [chunk for _, chunk in batch], config={"meta": f"tree:{first}-{last}"}
+                        )
+                        self.cache.remember("ChunkTreeBatchChain", "chunk_tree", blocks, outs)
+                    except Exception as e:
+                        # the batched reply still failed after retries; fall back to one call per chunk
+                        print(f"[tree] chunks {first}-{last}: batched call failed ({type(e).__name__}: {e}); falling back to per-chunk")
+            done: List[Dict] = []
+            for i, ((idx, chunk), out) in enumerate(zip(batch, outs)):
+                # single chunks, and any chunk the batched reply skipped, go one call each
+                if out is None:
+                    out = self.cache.call(
+                        "ChunkTreeChain", "chunk_tree", blocks[i],
+                        lambda: self.retryer.call(chain.invoke, chunk, config={"meta": f"tree:{idx}"}),
+                    )
+                done.append(finish(chunk, out))
+            return done
+
+        # near-duplicate chunks (repeated boilerplate) only go to the LLM once
+        leaders = near_duplicate_leaders([self._chunk_text(c) for _, c in items], dedup_threshold)
+        # filler chunks (TOC, navigation, code/image only) get an empty tree without an LLM call;
+        # later steps already skip items whose "tree" is empty
+        filler = {idx for idx, c in items if self._prose_tokens(c) < min_prose_tokens}
+        if filler and len(filler) == len(items):
+            # skipping everything would leave an empty mindmap; treat the threshold as too strict
+            print(f"[tree] all {len(items)} chunks are under {min_prose_tokens} prose tokens; not skipping any")
+            filler = set()
+        elif filler:
+            print(f"[tree] skipped {len(filler)} of {len(items)} chunks under {min_prose_tokens} prose tokens")
+        leaders = [idx if lead in filler and idx not in filler else lead for idx, lead in enumerate(leaders)]
+        unique = [it for it in items if leaders[it[0]] == it[0] and it[0] not in filler]
+
+        batches = self._micro_batches(unique, max(1, batch_size), batch_token_budget)
+        by_idx: Dict[int, Dict] = {}
+        pool = executor.acquire()
+        # trees land in a JSONL log as they complete; the array artifact is written once at the end
+        with store.debug_jsonl(self.PARTIAL_ARTIFACT) as write_partial:
+            # submit everything, then collect in completion order so a slow head batch
+            # doesn't hold back progress (results are keyed by chunk index anyway)
+            futs = {pool.submit(process, batch): batch for batch in batches}
+            for done in completed_batches(futs):
+                for fut in done:
+                    batch = futs[fut]
+                    for (idx, _), out in zip(batch, fut.result()):
+                        by_idx[idx] = out
+                        write_partial(out)
+                    progress.advance(task, len(batch))
+
         results: List[Dict] = []
-        with executor.get() as pool:
-            futures = {pool.submit(process, item): item for item in items}
-            for fut in as_completed(futures):
-                results.append(fut.result())
+        for idx, chunk in items:
+            if idx in filler:
+                results.append(finish(chunk, {"tree": None, "tags": []}))
+                progress.advance(task)
+                continue
+            out = by_idx[leaders[idx]]
+            if leaders[idx] != idx:
+                out = finish(chunk, copy.deepcopy({k: v for k, v in out.items() if k != "metadata"}))
                 progress.advance(task)
+            results.append(out)
 
         ctx.chunk_results = results
         store.save_debug(self.ARTIFACT, ctx.chunk_results)
+        store.save_debug_fast(self.ARTIFACT, ctx.chunk_results)
+        store.discard_debug(self.PARTIAL_ARTIFACT)
         progress.finish(task)
         return ctx
\ No newline at end of file
@@ -1,5 +1,6 @@
 # FILE: mark2mind/mark2mind/recipes/__init__.py
 from __future__ import annotations
+from functools import lru_cache
 from importlib.resources import files as _pkg_files
 from pathlib import Path
 import os
@@ -27,37 +28,44 @@ ALIASES: Dict[str, str] = {
     "bullets_from_markdown": "outline_markdown",
 }
 
+# every accepted spelling (canonical, alias, and their ".toml" forms) -> canonical key
+_ALL: Dict[str, str] = {**{k: k for k in CANONICAL}, **ALIASES}
+_ALL.update({f"{k}.toml": v for k, v in list(_ALL.items())})
+
 def _resolve_key(name: str) -> str:
-    if name in CANONICAL:
-        return name
-    if name in ALIASES:
-        return ALIASES[name]
-    stem = name.replace(".toml", "")
-    if stem in CANONICAL:
-        return stem
-    if stem in ALIASES:
-        return ALIASES[stem]
-    raise SystemExit(
-        f"Unknown recipe '{name}'. Try one of: {', '.join(sorted(CANONICAL.keys()))}"
-        f" (aliases: {', '.join(sorted(ALIASES.keys()))})"
-    )
+    try:
+        return _ALL[name]
+    except KeyError:
+        raise SystemExit(
+            f"Unknown recipe '{name}'. Try one of: {', '.join(sorted(CANONICAL.keys()))}"
+            f" (aliases: {', '.join(sorted(ALIASES.keys()))})"
+        ) from None
+
+_PKG_ROOT = _pkg_files(__package__)
+# built-in recipe paths, resolved once at import
+_RESOLVED: Dict[str, Path] = {k: Path(_PKG_ROOT / v) for k, v in CANONICAL.items()}
+_SEEDED = False
 
 def get_recipe_names() -> List[str]:
     return sorted(CANONICAL.keys())
 
+@lru_cache(maxsize=1)
 def _user_recipes_dir() -> Path:
     base = os.getenv("APPDATA") or os.path.expanduser("~/.mark2mind")
     return Path(base) / "mark2mind" / "recipes" if os.getenv("APPDATA") else Path(base) / "recipes"
 
 def _copy_builtins_to_user_once() -> None:
+    global _SEEDED
+    if _SEEDED:
+        return
     target = _user_recipes_dir()
     target.mkdir(parents=True, exist_ok=True)
     sentinel = target / ".installed"
     if sentinel.exists():
+        _SEEDED = True
         return
-    pkg_root = _pkg_files(__package__)
-    for filename in CANONICAL.values():
-        src = pkg_root / filename
+    for canon, filename in CANONICAL.items():
+        src = _RESOLVED[canon]
         dst = target / filename
         try:
             with src.open("rb") as fsrc, dst.open("wb") as fdst:
@@ -65,12 +73,11 @@ def _copy_builtins_to_user_once() -> None:
         except Exception:
             pass
     sentinel.write_text("ok", encoding="utf-8")
+    _SEEDED = True
 
+@lru_cache(maxsize=None)
 def get_recipe_path(name: str) -> Path:
     canon = _resolve_key(name)
     _copy_builtins_to_user_once()
     user_p = _user_recipes_dir() / CANONICAL[canon]
-    if user_p.exists():
-        return user_p
-    p = _pkg_files(__package__) / CANONICAL[canon]
-    return Path(p)
+    return user_p if user_p.exists() else _RESOLVED[canon]
@@ -1,11 +1,13 @@
 import contextlib
 import io
-import json
 import hashlib
 import re
 import os
+import uuid
+from collections import Counter
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 import sys
 from tokenizers import Tokenizer 
 
@@ -14,6 +16,16 @@ class HFTokenizerShim:
         self._tk = tk
     def encode(self, text: str):
         return self._tk.encode(text).ids
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        # one Rust call for the whole list instead of one per text; repeated texts
+        # (empty blocks, boilerplate, recurring headings) are encoded once
+        texts = list(texts)
+        uniq = list(dict.fromkeys(texts))
+        lengths = [len(e.ids) for e in self._tk.encode_batch(uniq)]
+        if len(uniq) == len(texts):
+            return lengths
+        by_text = dict(zip(uniq, lengths))
+        return [by_text[t] for t in texts]
 
 def _app_dir() -> Path:
     # Frozen: keep next to the EXE
@@ -27,6 +39,7 @@ def _safe_name(repo_id: str) -> str:
 
 from huggingface_hub import hf_hub_download
 
+@lru_cache(maxsize=4)
 def load_tokenizer(tokenizer_name: str) -> HFTokenizerShim:
     safe = _safe_name(tokenizer_name)
     cand = _app_dir() / "vendor_models" / safe / "tokenizer.json"
@@ -44,9 +57,15 @@ def load_tokenizer(tokenizer_name: str) -> HFTokenizerShim:
     return HFTokenizerShim(Tokenizer.from_file(path))
 
 
+import semchunk
 from markdown_it import MarkdownIt
+from mark2mind.utils.debug import write_debug_file
 from slugify import slugify
 
+_WS_RE = re.compile(r"\s+")
+# non-breaking space -> space; zero-width spaces/joiners and BOM -> removed
+_ID_CHAR_TABLE = str.maketrans({"\u00A0": " ", "\u200B": None, "\u200C": None, "\u200D": None, "\ufeff": None})
+
 def _normalize_for_id(s: str) -> str:
     """
     Normalize text for stable hashing:
@@ -58,28 +77,65 @@ def _normalize_for_id(s: str) -> str:
     if not s:
         return ""
 
-    # Replace non-breaking spaces with regular spaces
-    s = s.replace("\u00A0", " ")
+    # one pass for NBSP and zero-width/BOM, then strip and collapse whitespace
+    return _WS_RE.sub(" ", s.translate(_ID_CHAR_TABLE).strip())
+
 
-    # Remove zero-width spaces/joiners and BOM
-    s = s.replace("\u200B", "").replace("\u200C", "").replace("\u200D", "").replace("\ufeff", "")
+try:
+    from blake3 import blake3 as _blake3
+except Exception:
+    _blake3 = None
 
-    # Standard strip and collapse
-    s = s.strip()
-    s = re.sub(r"\s+", " ", s)
+def _hash8_sha1(s: str) -> str:
+    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:8]
 
-    return s
+def _hash8_blake2b(s: str) -> str:
+    return hashlib.blake2b(s.encode("utf-8"), digest_size=4).hexdigest()
+
+def _hash8_blake3(s: str) -> str:
+    return _blake3(s.encode("utf-8")).hexdigest()[:8]
+
+# MARK2MIND_ID_HASH: blake2b (default), sha1 (IDs from runs before the switch), or
+# blake3 (needs the blake3 package). Each choice always yields the same IDs.
+_ID_HASH = os.getenv("MARK2MIND_ID_HASH", "blake2b").strip().lower()
+if _ID_HASH == "sha1":
+    _hash8 = _hash8_sha1
+elif _ID_HASH == "blake3" and _blake3 is not None:
+    _hash8 = _hash8_blake3
+else:
+    _hash8 = _hash8_blake2b
+
+@lru_cache(maxsize=65536)
+def _slug8(s: str) -> str:
+    # headings and repeated captions hit the same text many times
+    return slugify(s)[:8]
+
+def _id_path(prefix: str, heading_path) -> tuple:
+    # scope is read per call: StepRunner sets MARK2MIND_ID_SCOPE after this module is imported
+    scope = os.environ.get("MARK2MIND_ID_SCOPE")
+    if scope is None:
+        scope = "content+path" if prefix == "image" else "content"
+    return tuple(heading_path) if scope == "content+path" and heading_path else ()
+
+def _image_content(src, alt, heading_path) -> str:
+    content = (src or "").strip() or (alt or "").strip()
+    # Never allow empty content for images
+    if not content:
+        if heading_path:
+            content = " / ".join(heading_path)
+        else:
+            content = uuid.uuid4().hex  # absolute last-resort uniqueness
+    return content
 
+def text_element_id(content: str, prefix: str, heading_path=None) -> str:
+    """Same ID as generate_element_id({"text": content}, prefix, ...), without inspecting a dict."""
+    return _element_id(prefix, content or "", _id_path(prefix, heading_path))
 
-def _hash8(s: str) -> str:
-    return hashlib.sha1(s.encode("utf-8")).hexdigest()[:8]
+def image_element_id(src: str, alt: str, heading_path=None) -> str:
+    """Same ID as generate_element_id({"type": "image", "src": src, "alt": alt}, "image", ...)."""
+    return _element_id("image", _image_content(src, alt, heading_path), _id_path("image", heading_path))
 
 def generate_element_id(block, prefix, heading_path=None):
-    import os, uuid
-    scope = os.getenv("MARK2MIND_ID_SCOPE", "content")
-    if prefix == "image":
-        scope = os.getenv("MARK2MIND_ID_SCOPE", "content+path")
-
     # Detect image payloads reliably
     is_image = False
     if isinstance(block, dict):
@@ -87,243 +143,290 @@ def generate_element_id(block, prefix, heading_path=None):
             is_image = True
 
     if is_image:
-        src = (block.get("src") or "").strip()
-        alt = (block.get("alt") or "").strip()
-        content = src or alt
-        # Never allow empty content for images
-        if not content:
-            if heading_path:
-                content = " / ".join(heading_path)
-            else:
-                content = uuid.uuid4().hex  # absolute last-resort uniqueness
+        content = _image_content(block.get("src"), block.get("alt"), heading_path)
     else:
         if isinstance(block, dict):
             content = block.get("text") or block.get("markdown") or block.get("alt") or block.get("src") or ""
         else:
             content = ""
 
+    return _element_id(prefix, content, _id_path(prefix, heading_path))
+
+
+@lru_cache(maxsize=4096)
+def _element_id(prefix: str, content: str, path: tuple) -> str:
+    # repeated headings, captions and boilerplate paragraphs skip normalise/slug/hash
     norm = _normalize_for_id(content)
 
-    if scope == "content+path" and heading_path:
-        path_norm = _normalize_for_id(" / ".join(heading_path))
+    if path:
+        path_norm = _normalize_for_id(" / ".join(path))
         payload = f"{norm} || {path_norm}"
     else:
         payload = norm
 
     slug_base = norm or prefix  # avoid empty slug
-    slug = slugify(slug_base)[:8] or "item"
+    slug = _slug8(slug_base) or "item"
     h = _hash8(payload)
     return f"{prefix}_{slug}_{h}"
 
 
-def parse_markdown_as_tree(md_text: str):
-    md = MarkdownIt("gfm-like")
-    tokens = md.parse(md_text)
+# built once: parse() keeps all per-document state in its own StateCore
+_MD = MarkdownIt("gfm-like")
 
-    root = {"type": "root", "children": []}
-    stack = [(0, root)]  # (level, node)
-    i = 0
+try:
+    _STREAM_PARSE_CHARS = int(os.getenv("MARK2MIND_MD_STREAM_CHARS", str(10_000_000)))
+except Exception:
+    _STREAM_PARSE_CHARS = 10_000_000
+# link reference definitions ("[ref]: url") resolve per parse, so documents that have
+# any are parsed whole; a false positive (e.g. inside a code fence) only costs memory
+_REF_DEF = re.compile(r"^ {0,3}\[(?:[^\]\\]|\\.)+\]:", re.MULTILINE)
+_ATX_HEADING = re.compile(r"^ {0,3}#{1,6}(?:[ \t]|$)")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
 
-    def get_heading_path(stack):
-        return [n["text"] for lvl, n in stack if n["type"] == "heading"]
+def _iter_token_sections(md: MarkdownIt, md_text: str):
+    """
+    Yield markdown-it token lists. Small documents are parsed in one go; very large
+    ones are cut before each ATX heading (outside code fences) and parsed section by
+    section, so only one section's tokens are alive at a time. The tree walk keeps
+    its heading stack across sections, so the result is the same tree.
+    """
+    if len(md_text) <= _STREAM_PARSE_CHARS or _REF_DEF.search(md_text):
+        yield md.parse(md_text)
+        return
+    buf: List[str] = []
+    fence = ""
+    for line in md_text.splitlines(keepends=True):
+        m = _FENCE.match(line)
+        if m:
+            mark = m.group(1)
+            if not fence:
+                fence = mark
+            elif mark[0] == fence[0] and len(mark) >= len(fence) and not line.strip().strip(mark[0]):
+                fence = ""
+        elif not fence and buf and _ATX_HEADING.match(line):
+            yield md.parse("".join(buf))
+            buf = []
+        buf.append(line)
+    if buf:
+        yield md.parse("".join(buf))
+
+def parse_markdown_as_tree(md_text: str, flat: Optional[List[dict]] = None):
+    """
+    Parse markdown into nested heading/content blocks. If `flat` is given, every block
+    is also appended to it in document order (the tree's pre-order), with the same
+    heading_path the nested walk would assign.
+    """
+    emit = flat.append if flat is not None else (lambda _b: None)
 
-    def add_child_to_parent(level, block):
-        # Find closest parent with lower level
-        level = max(1, min(level, stack[-1][0] + 1))
-        while stack and stack[-1][0] >= level and stack[-1][0] > 0:
-            stack.pop()
+    root = {"type": "root", "children": []}
+    # open node per heading level (0 = root); content attaches to the deepest open one
+    level_to_node: List[Optional[dict]] = [root] + [None] * 6
+    deepest = 0
+    path_stack: List[str] = []  # heading texts of the open headings, shallowest first
+    # tuple snapshot of path_stack, rebuilt only when a heading opens; every block under
+    # that heading shares the same tuple instead of carrying its own list copy
+    cur_path: tuple = ()
 
-        parent = stack[-1][1]
+    def add_child_to_parent(level, block):
+        nonlocal deepest
+        # close open headings at this level or deeper
+        for k in range(level, deepest + 1):
+            if level_to_node[k] is not None:
+                level_to_node[k] = None
+                path_stack.pop()
+        # closest open node above this level
+        parent = next(
+            level_to_node[k] for k in range(min(level, deepest + 1) - 1, -1, -1) if level_to_node[k] is not None
+        )
         parent.setdefault("children", []).append(block)
+        emit(block)
+        level_to_node[level] = block
+        deepest = level
         return parent
 
-    while i < len(tokens):
-        token = tokens[i]
-
-        if token.type == "heading_open":
-            level = int(token.tag[1])
-            heading_text = tokens[i + 1].content.strip()
-            block = {
-                "type": "heading",
-                "level": level,
-                "text": heading_text,
-                "element_id": generate_element_id({"text": heading_text}, "heading", heading_path=get_heading_path(stack) + [heading_text]),
-                "children": []
-            }
-            parent = add_child_to_parent(level, block)
-            stack.append((level, block))
-            i += 3
-            block["heading_path"] = get_heading_path(stack)
-
-
-        elif token.type == "paragraph_open":
-            inline_token = tokens[i + 1]
-            if inline_token.type == "inline" and inline_token.children:
-                # Extract image(s)
-                for child in inline_token.children:
+    for tokens in _iter_token_sections(_MD, md_text):
+        # one forward pass; multi-token constructs consume their tokens from `it`
+        it = iter(tokens)
+        for token in it:
+            ttype = token.type
+
+            if ttype == "heading_open":
+                level = int(token.tag[1])
+                heading_text = next(it).content.strip()
+                next(it, None)  # heading_close
+                block = {
+                    "type": "heading",
+                    "level": level,
+                    "text": heading_text,
+                    "element_id": text_element_id(heading_text, "heading", heading_path=cur_path + (heading_text,)),
+                    "children": []
+                }
+                parent = add_child_to_parent(level, block)
+                path_stack.append(heading_text)
+                cur_path = tuple(path_stack)
+                block["heading_path"] = cur_path
+
+
+            elif ttype == "paragraph_open":
+                inline_token = next(it)
+                next(it, None)  # paragraph_close
+                if inline_token.type == "inline" and inline_token.children:
+                    # Extract image(s)
+                    for child in inline_token.children:
+                        if child.type == "image":
+                            block = {
+                                "type": "image",
+                                "alt": child.content,
+                                "src": child.attrs["src"],
+                                "element_caption": child.content,
+                                "element_id": image_element_id(child.attrs.get("src", ""), child.content, heading_path=cur_path)
+                            }
+                            block["heading_path"] = cur_path
+                            level_to_node[deepest]["children"].append(block)
+                            emit(block)
+                    # Extract text
+                    text_content = ''.join(c.content for c in inline_token.children if c.type == "text").strip()
+                    if text_content:
+                        block = {
+                            "type": "paragraph",
+                            "text": text_content,
+                            "element_id": text_element_id(text_content, "paragraph", heading_path=cur_path)
+                        }
+                        block["heading_path"] = cur_path
+                        level_to_node[deepest]["children"].append(block)
+                        emit(block)
+
+            elif ttype == "inline" and token.children:
+                for child in token.children:
                     if child.type == "image":
                         block = {
                             "type": "image",
                             "alt": child.content,
                             "src": child.attrs["src"],
                             "element_caption": child.content,
-                            "element_id": generate_element_id({"type": "image", "src": child.attrs.get("src", ""), "alt": child.content}, "image", heading_path=get_heading_path(stack))
+                            "element_id": image_element_id(child.attrs.get("src", ""), child.content, heading_path=cur_path)
                         }
-                        block["heading_path"] = get_heading_path(stack)
-                        stack[-1][1]["children"].append(block)
-                # Extract text
-                text_content = ''.join(c.content for c in inline_token.children if c.type == "text").strip()
-                if text_content:
-                    block = {
-                        "type": "paragraph",
-                        "text": text_content,
-                        "element_id": generate_element_id({"text": text_content}, "paragraph", heading_path=get_heading_path(stack))
-                    }
-                    block["heading_path"] = get_heading_path(stack)
-                    stack[-1][1]["children"].append(block)
-            i += 3
+                        block["heading_path"] = cur_path
+                        level_to_node[deepest]["children"].append(block)
+                        emit(block)
 
-        elif token.type == "inline" and token.children:
-            for child in token.children:
-                if child.type == "image":
+            elif ttype == "fence":
+                block = {
+                    "type": "code",
+                    "language": token.info.strip(),
+                    "text": token.content.strip(),
+                    "element_id": text_element_id(token.content, "code", heading_path=cur_path)
+                    }
+                block["heading_path"] = cur_path
+                level_to_node[deepest]["children"].append(block)
+                emit(block)
+
+            elif ttype == "table_open":
+                # Convert the table's tokens (up to table_close) to a markdown string
+                table_md_lines = []
+                row = []
+                is_header = False
+
+                for tok in it:
+                    if tok.type == "table_close":
+                        break
+                    ttok = tok.type
+                    if ttok == "inline":
+                        row.append(tok.content.strip())
+                    elif ttok == "tr_open":
+                        row.clear()
+                    elif ttok == "tr_close":
+                        if not is_header:
+                            table_md_lines.append(f"| {' | '.join(row)} |")
+                    elif ttok == "thead_open":
+                        is_header = True
+                    elif ttok == "thead_close":
+                        is_header = False
+                        table_md_lines.append(f"| {' | '.join(row)} |")
+                        table_md_lines.append(f"| {' | '.join(['---'] * len(row))} |")
+                        row.clear()
+
+                table_md = "\n".join(table_md_lines)
+
+                if table_md.strip():
                     block = {
-                        "type": "image",
-                        "alt": child.content,
-                        "src": child.attrs["src"],
-                        "element_caption": child.content,
-                        "element_id": generate_element_id({"type": "image", "src": child.attrs.get("src", ""), "alt": child.content}, "image", heading_path=get_heading_path(stack))
+                        "type": "table",
+                        "text": table_md,
+                        "element_id": text_element_id(table_md, "table", heading_path=cur_path),
+                        "heading_path": cur_path
                     }
-                    block["heading_path"] = get_heading_path(stack)
-                    stack[-1][1]["children"].append(block)
-            i += 1
-
-        elif token.type == "fence":
-            block = {
-                "type": "code",
-                "language": token.info.strip(),
-                "text": token.content.strip(),
-                "element_id": generate_element_id({"text": token.content}, "code", heading_path=get_heading_path(stack))
-                }
-            block["heading_path"] = get_heading_path(stack)
-            stack[-1][1]["children"].append(block)
-            i += 1
-
-        elif token.type == "table_open":
-            table_tokens = []
-            while i < len(tokens) and tokens[i].type != "table_close":
-                table_tokens.append(tokens[i])
-                i += 1
-            i += 1  # Skip table_close
-
-            # Convert token sequence to markdown string
-            table_md_lines = []
-            row = []
-            is_header = False
-
-            for tok in table_tokens:
-                if tok.type == "thead_open":
-                    is_header = True
-                elif tok.type == "thead_close":
-                    is_header = False
-                    table_md_lines.append("| " + " | ".join(row) + " |")
-                    table_md_lines.append("| " + " | ".join(["---"] * len(row)) + " |")
-                    row = []
-                elif tok.type == "tr_open":
-                    row = []
-                elif tok.type == "tr_close":
-                    if not is_header:
-                        table_md_lines.append("| " + " | ".join(row) + " |")
-                elif tok.type == "inline":
-                    row.append(tok.content.strip())
-
-            table_md = "\n".join(table_md_lines)
-
-            if table_md.strip():
-                block = {
-                    "type": "table",
-                    "text": table_md,
-                    "element_id": generate_element_id({"text": table_md}, "table", heading_path=get_heading_path(stack)),
-                    "heading_path": get_heading_path(stack)
-                }
-                stack[-1][1]["children"].append(block)
-
-
-        else:
-            i += 1
+                    level_to_node[deepest]["children"].append(block)
+                    emit(block)
 
     return root["children"]
 
+_BLOCK_RENDERERS = {
+    "heading": lambda b: "#" * b["level"] + " " + b["text"],
+    "paragraph": lambda b: b["text"],
+    "image": lambda b: f'![{b.get("alt", "")}]({b["src"]})',
+    "code": lambda b: f'```{b["language"]}\n{b["text"]}\n```',
+    "table": lambda b: b["text"],
+}
+
 def block_to_markdown(block):
-    if block["type"] == "heading":
-        return "#" * block["level"] + " " + block["text"]
-    elif block["type"] == "paragraph":
-        return block["text"]
-    elif block["type"] == "image":
-        return f'![{block.get("alt", "")}]({block["src"]})'
-    elif block["type"] == "code":
-        return f'```{block["language"]}\n{block["text"]}\n```'
-    elif block["type"] == "table":
-        return block["text"]
-    return ""
+    render = _BLOCK_RENDERERS.get(block["type"])
+    return render(block) if render else ""
+
+@lru_cache(maxsize=8)
+def _sem_chunker(tokenizer, max_tokens: int):
+    # built once per tokenizer/size so semchunk's memoized token counter is shared
+    # across every oversized paragraph instead of re-counting the same spans
+    return semchunk.chunkerify(tokenizer, chunk_size=max_tokens)
 
 def fallback_semantic_split(text, tokenizer, max_tokens):
-    import semchunk
-    sem_chunker = semchunk.chunkerify(tokenizer, chunk_size=max_tokens)
-    return sem_chunker(text)
+    return _sem_chunker(tokenizer, max_tokens)(text)
+
+_ATOMIC_TYPES = frozenset({"code", "table", "image"})
+
+def _enrich_block(block: dict, markdown: str, token_count: int) -> dict:
+    # a heading's nested subtree is already flattened into the chunk; don't carry it along
+    b = {k: v for k, v in block.items() if k != "children"}
+    b["markdown"] = markdown
+    b["token_count"] = token_count
+    b["is_atomic"] = block["type"] in _ATOMIC_TYPES
+    return b
+
+def _emit_chunk(enriched_blocks: list) -> dict:
+    parts = []
+    total = 0
+    for b in enriched_blocks:
+        md = b.get("markdown")
+        if md:
+            parts.append(md)
+        total += b["token_count"]
+    return {
+        "blocks": enriched_blocks,
+        # two newlines between blocks keeps headings/paragraphs/code visually separated
+        "md_text": "\n\n".join(parts),
+        "metadata": {
+            "token_count": total,
+        },
+    }
 
-def chunk_markdown(md_text: str, max_tokens: int = 2000, tokenizer_name: str = "gpt2", debug=False, debug_dir=Path("debug")) -> List[dict]:
+def chunk_markdown(md_text: str, max_tokens: int = 2000, tokenizer_name: str = "gpt2") -> List[dict]:
     tokenizer = load_tokenizer(tokenizer_name)
+    try:
+        CHUNK_OVERLAP_TOKENS = int(os.getenv("MARK2MIND_CHUNK_OVERLAP_TOKENS", "0"))
+    except Exception:
+        CHUNK_OVERLAP_TOKENS = 0
 
     chunks = []
     current_chunk = []
     current_tokens = 0
 
-    def count_tokens(text: str) -> int:
-        return len(tokenizer.encode(text))
-
-    def is_atomic(block: dict) -> bool:
-        return block["type"] in {"code", "table", "image"}
-
-    def flatten_blocks_with_paths(tree_blocks):
-        flat = []
-        def walk(blocks, heading_path):
-            for block in blocks:
-                if block["type"] == "heading":
-                    new_path = heading_path[:] + [block["text"]]
-                    block["heading_path"] = new_path
-                    flat.append(block)
-                    walk(block.get("children", []), new_path)
-                else:
-                    block["heading_path"] = heading_path[:]
-                    flat.append(block)
-        walk(tree_blocks, [])
-        return flat
-
-    def enrich_block(block: dict) -> dict:
-        b = dict(block)
-        b["markdown"] = block_to_markdown(block)
-        b["token_count"] = count_tokens(b["markdown"])
-        b["is_atomic"] = is_atomic(block)
-        return b
-
-    def join_markdown(enriched_blocks: list) -> str:
-        # two newlines between blocks keeps headings/paragraphs/code visually separated
-        return "\n\n".join(b.get("markdown", "") for b in enriched_blocks if b.get("markdown"))
-
-    def emit_chunk(enriched_blocks: list) -> dict:
-        return {
-            "blocks": enriched_blocks,
-            "md_text": join_markdown(enriched_blocks),         # <-- add this
-            "metadata": {
-                "token_count": sum(b["token_count"] for b in enriched_blocks),
-            },
-        }
+    blocks: List[dict] = []
+    parse_markdown_as_tree(md_text, flat=blocks)
 
-    tree_blocks = parse_markdown_as_tree(md_text)
-    blocks = flatten_blocks_with_paths(tree_blocks)
+    markdowns = [block_to_markdown(b) for b in blocks]
+    lengths = tokenizer.token_lengths(markdowns)
 
-    for block in blocks:
-        enriched = enrich_block(block)
+    for block, markdown, n_tokens in zip(blocks, markdowns, lengths):
+        enriched = _enrich_block(block, markdown, n_tokens)
 
         # Oversized atomic → emit alone
         if enriched["is_atomic"] and enriched["token_count"] > max_tokens:
@@ -341,23 +444,22 @@ def chunk_markdown(md_text: str, max_tokens: int = 2000, tokenizer_name: str = "
 
         # Oversized paragraph → semantic split while preserving original heading_path
         if block["type"] == "paragraph" and enriched["token_count"] > max_tokens:
-            sub_chunks = fallback_semantic_split(enriched["markdown"], tokenizer, max_tokens)
-            for sub in sub_chunks:
-                sub_md = sub.strip()
+            sub_mds = [sub.strip() for sub in fallback_semantic_split(enriched["markdown"], tokenizer, max_tokens)]
+            for sub_md, sub_tokens in zip(sub_mds, tokenizer.token_lengths(sub_mds)):
                 sub_block = {
                     "type": "paragraph",
                     "text": sub_md,
                     "markdown": sub_md,
                     "heading_path": enriched["heading_path"],
-                    "token_count": count_tokens(sub_md),
+                    "token_count": sub_tokens,
                     "is_atomic": False,
-                    "element_id": generate_element_id({"text": sub_md}, "paragraph", heading_path=enriched["heading_path"])
+                    "element_id": text_element_id(sub_md, "paragraph", heading_path=enriched["heading_path"])
                 }
                 chunks.append({
                     "blocks": [sub_block],
                     "md_text": sub_md,                          
                     "metadata": {
-                        "token_count": count_tokens(sub_md),
+                        "token_count": sub_tokens,
                         "type": "paragraph"
                     }
                 })
@@ -366,24 +468,20 @@ def chunk_markdown(md_text: str, max_tokens: int = 2000, tokenizer_name: str = "
         # Start a new chunk if this one would overflow
         if current_tokens + enriched["token_count"] > max_tokens:
             if current_chunk:
-                chunks.append(emit_chunk(current_chunk))
+                chunks.append(_emit_chunk(current_chunk))
 
                 # Token overlap (~200) — skip atomic blocks for overlap
-                try:
-                    CHUNK_OVERLAP_TOKENS = int(os.getenv("MARK2MIND_CHUNK_OVERLAP_TOKENS", "0"))
-                except Exception:
-                    CHUNK_OVERLAP_TOKENS = 0
                 rewind_tokens = 0
                 overlap_chunk = []
                 for b in reversed(current_chunk):
                     if b["is_atomic"]:
                         continue
                     rewind_tokens += b["token_count"]
-                    overlap_chunk.insert(0, b)
+                    overlap_chunk.append(b)  # collected back to front, flipped once below
                     if rewind_tokens >= CHUNK_OVERLAP_TOKENS:
                         break
 
-                current_chunk = overlap_chunk
+                current_chunk = overlap_chunk[::-1]
                 current_tokens = rewind_tokens
             else:
                 current_chunk = []
@@ -393,42 +491,29 @@ def chunk_markdown(md_text: str, max_tokens: int = 2000, tokenizer_name: str = "
         current_tokens += enriched["token_count"]
 
     if current_chunk:
-        chunks.append(emit_chunk(current_chunk))
-
-    if debug and debug_dir:
-        os.makedirs(debug_dir, exist_ok=True)
-        from collections import Counter
-        block_types = Counter()
-        for chunk in chunks:
-            for block in chunk["blocks"]:
-                block_types[block["type"]] += 1
-
-        print(f"🖼️ Images: {block_types['image']}")
-        print(f"📊 Tables: {block_types['table']}")
-        print(f"📄 Paragraphs: {block_types['paragraph']}")
-        print(f"💻 Code blocks: {block_types['code']}")
-
-        grouped_blocks = {"paragraph": [], "image": [], "table": [], "code": []}
-        for chunk in chunks:
-            for block in chunk["blocks"]:
-                btype = block["type"]
-                if btype in grouped_blocks:
-                    grouped_blocks[btype].append(block)
-
-        for btype, blks in grouped_blocks.items():
-            file_path = os.path.join(debug_dir, f"{btype}s.json")
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(blks, f, indent=2, ensure_ascii=False)
-
-        def clean_block(b):
-            return {k: v for k, v in b.items() if k != "children"}
-
-        for c in chunks:
-            c["blocks"] = [clean_block(b) for b in c["blocks"]]
-
-        all_chunks_path = os.path.join(debug_dir, "chunks.json")
-        with open(all_chunks_path, "w", encoding="utf-8") as f:
-            json.dump(chunks, f, indent=2, ensure_ascii=False)
+        chunks.append(_emit_chunk(current_chunk))
 
     return chunks
 
+
+def dump_chunk_debug(chunks: List[dict], debug_dir: Path) -> None:
+    """
+    Print block-type counts and write paragraphs/images/tables/codes.json under debug_dir.
+    Reads `chunks` only.
+    """
+    block_types = Counter()
+    grouped_blocks = {"paragraph": [], "image": [], "table": [], "code": []}
+    for chunk in chunks:
+        for block in chunk["blocks"]:
+            btype = block["type"]
+            block_types[btype] += 1
+            if btype in grouped_blocks:
+                grouped_blocks[btype].append(block)
+
+    print(f"🖼️ Images: {block_types['image']}")
+    print(f"📊 Tables: {block_types['table']}")
+    print(f"📄 Paragraphs: {block_types['paragraph']}")
+    print(f"💻 Code blocks: {block_types['code']}")
+
+    for btype, blks in grouped_blocks.items():
+        write_debug_file(Path(debug_dir) / f"{btype}s.json", blks)
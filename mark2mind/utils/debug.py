@@ -1,8 +1,24 @@
 import json
+import os
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson as _orjson
+except Exception:
+    _orjson = None
+
+# compact by default; MARK2MIND_DEBUG_PRETTY=1 indents debug dumps for reading
+_PRETTY = os.getenv("MARK2MIND_DEBUG_PRETTY", "").strip() == "1"
+
 def write_debug_file(path: Path, data: Any):
     path.parent.mkdir(parents=True, exist_ok=True)
+    if _orjson is not None:
+        option = _orjson.OPT_NON_STR_KEYS | (_orjson.OPT_INDENT_2 if _PRETTY else 0)
+        path.write_bytes(_orjson.dumps(data, option=option))
+        return
     with path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        if _PRETTY:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        else:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
@@ -0,0 +1,42 @@
+from typing import Dict, List
+import hashlib
+
+
+def exact_duplicate_leaders(texts: List[str]) -> List[int]:
+    """For each text, the index of the first identical text (by content hash), or its own index."""
+    first: Dict[bytes, int] = {}
+    return [
+        first.setdefault(hashlib.blake2b(t.encode("utf-8"), digest_size=16).digest(), i)
+        for i, t in enumerate(texts)
+    ]
+
+
+def near_duplicate_leaders(texts: List[str], threshold: float, block_rows: int = 256) -> List[int]:
+    """
+    For each text, the index of the earliest text it near-duplicates (TF-IDF cosine >= threshold),
+    or its own index. Identical texts always match; threshold <= 0 disables fuzzy matching.
+    Similarities are computed one block of rows at a time against earlier rows only, so memory
+    stays at block_rows x N instead of the full N x N matrix.
+    """
+    leaders = exact_duplicate_leaders(texts)
+    if threshold <= 0 or len(texts) < 2:
+        return leaders
+    from sklearn.feature_extraction.text import TfidfVectorizer  # heavy; only when fuzzy dedup is on
+
+    try:
+        X = TfidfVectorizer().fit_transform(texts).tocsr()  # rows are L2-normalized
+    except ValueError:  # empty vocabulary
+        return leaders
+    n = len(texts)
+    for start in range(1, n, block_rows):
+        stop = min(n, start + block_rows)
+        sims = (X[start:stop] @ X[:stop].T).tocsr()
+        for r, i in enumerate(range(start, stop)):
+            if leaders[i] != i:
+                continue
+            lo, hi = sims.indptr[r], sims.indptr[r + 1]
+            cols, vals = sims.indices[lo:hi], sims.data[lo:hi]
+            hits = cols[(cols < i) & (vals >= threshold)]
+            if hits.size:
+                leaders[i] = leaders[int(hits.min())]
+    return leaders
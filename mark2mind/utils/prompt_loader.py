@@ -7,6 +7,7 @@ import sys
 BUILTIN_PROMPTS = {
     "chunk_tree":   "prompts/mindmap/mindmap_generator.txt",
     "merge_tree":   "prompts/mindmap/mindmap_merger.txt",
+    "merge_trees":  "prompts/mindmap/mindmap_merger_many.txt",
     "refine_tree":  "prompts/mindmap/mindmap_refiner.txt",
     "map_content":  "prompts/mindmap/content_mapper.txt",
     "map_content_qa":"prompts/mindmap/content_mapper_qa.txt",
@@ -1,7 +1,9 @@
 from __future__ import annotations
 from typing import List, Dict, Optional, Tuple
 from markdown_it import MarkdownIt
-from .chunker import generate_element_id
+from .chunker import text_element_id
+
+_MD = MarkdownIt("gfm-like")
 
 def _normalize_newlines(md: str) -> str:
     return md.replace("\r\n", "\n").replace("\r", "\n")
@@ -33,8 +35,7 @@ def parse_qa_markdown(md: str) -> List[Dict]:
     src = _normalize_newlines(md)
     src_lines = src.split("\n")
 
-    md_parser = MarkdownIt("gfm-like")
-    tokens = md_parser.parse(src)
+    tokens = _MD.parse(src)
 
     # Collect (idx, level, text, start_line) for every heading_open
     headings: List[Tuple[int, int, str, int]] = []
@@ -125,7 +126,7 @@ def parse_qa_markdown(md: str) -> List[Dict]:
     # Convert QA objects to minimal QA blocks for downstream mapping (QA-only chain)
     blocks: List[Dict] = []
     for qa in out_qa:
-        eid = generate_element_id({"text": qa["q"] + " || " + qa["a"]}, "qa", heading_path=qa["heading_path"])
+        eid = text_element_id(qa["q"] + " || " + qa["a"], "qa", heading_path=qa["heading_path"])
         blocks.append({
             "element_id": eid,
             "type": "qa",
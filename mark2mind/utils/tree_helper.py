@@ -21,7 +21,18 @@ def assign_node_ids(node: Dict, path: Optional[List[str]] = None) -> None:
         child["node_id"] = _compute_node_id(child_path, sibling_index=idx)
         assign_node_ids(child, path=path)
 
-def insert_content_refs_into_tree(tree: Dict, mapped_content: List[Dict]) -> None:
+def index_nodes_by_id(tree: Dict) -> Dict[str, Dict]:
+    """node_id -> node, built in one pre-order walk (first occurrence wins, as a DFS search would)."""
+    by_id: Dict[str, Dict] = {}
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        by_id.setdefault(node.get("node_id"), node)
+        stack.extend(reversed(node.get("children", []) or []))
+    return by_id
+
+
+def insert_content_refs_into_tree(tree: Dict, mapped_content: List[Dict], index: Optional[Dict[str, Dict]] = None) -> None:
     """
     Insert content refs into nodes. Supports:
       - paragraph/code/table/image: stored as markdown + element_caption
@@ -31,19 +42,14 @@ def insert_content_refs_into_tree(tree: Dict, mapped_content: List[Dict]) -> Non
       - ``markdown``: content (for QA this is ``## Q\nA``)
       - ``hash``: ``sha256:<hex>`` of ``markdown``
       - ``created_at``: ISO-8601 UTC timestamp
+
+    Pass ``index`` (from ``index_nodes_by_id``) to reuse a node index built elsewhere.
     """
 
-    def find_node(node: Dict, node_id: str) -> Optional[Dict]:
-        if node.get("node_id") == node_id:
-            return node
-        for child in node.get("children", []):
-            found = find_node(child, node_id)
-            if found:
-                return found
-        return None
+    by_id = index if index is not None else index_nodes_by_id(tree)
 
     for item in mapped_content:
-        target = find_node(tree, item.get("target_node_id"))
+        target = by_id.get(item.get("target_node_id"))
         if not target:
             continue
 
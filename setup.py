@@ -38,6 +38,7 @@ setup(
     extras_require={
         "dev": ["pytest", "pyinstaller==6.6"],
         "lite": ["numpy==1.26.4"],
+        "fast": ["orjson", "msgpack"],
     },
     entry_points={"console_scripts": ["mark2mind=mark2mind.main:main"]},
     zip_safe=False,